@@ -1,18 +1,28 @@
 import os
 import sys
-import joblib
 import builtins
+import multiprocessing
+import threading
+import time
+from collections import namedtuple
+import numpy as np
 from tkinter import messagebox, filedialog
-from components.preprocess import clean_text
-from components.sms_cropper import SMSCropper
-from components.feature_extraction import detect_urls, detect_emails, detect_phone_numbers, detect_domains
+from components.preprocess import MAX_MESSAGE_LENGTH as DEFAULT_MAX_MESSAGE_LENGTH, warm_up
+from components.classifier import classify_batch, classify_message
+from components.inference_pool import InferencePool, JobDropped
+from components.ingest_queue import POLICIES as INGEST_QUEUE_POLICIES, REJECT, QueueFull
+from components.process_engine import ProcessClassifier
 from components.intro_screen import IntroScreen
+from components.prediction_cache import PredictionCache
+from components.model_loader import BackgroundLoader
+from components.linear_model import to_linear_scorer
+from components.fused_scorer import build_fused_scorer
+from components.model_bundle import bundle_is_stale, load_bundle
+from components.model_reloader import ModelHolder, ModelReloader, ModelState
 from components.user_verification import UserVerification
-from components.network_sms_receiver import NetworkSMSReceiver, PORT
+from components.network_sms_receiver import NetworkSMSReceiver, PORT, RequestRejected
 import socket
 import customtkinter as ctk
-import qrcode
-from PIL import ImageTk
 from design import build_ui, load_user_settings
 
 # ============================================================== #
@@ -30,38 +40,231 @@ def resource_path(relative_path):
 
 MODEL_PATH = resource_path("model/sms_model.joblib")
 VECTORIZER_PATH = resource_path('model/tfidf_vectorizer.joblib')
+# Single-file, memory-mapped model (model/export_bundle.py); preferred over the joblib pair
+MODEL_BUNDLE_PATH = resource_path("model/sms_model.bundle")
 
 # ============================================================== #
 #                    MODEL INITIALIZATION                        #
 # ============================================================== #
 
-MODEL = None
-VECTORIZER = None
+DEFAULT_LABELS = ['ham', 'smishing', 'spam']  # joblib models; a bundle carries its own label names
+
+# Model, vectorizer, labels, version, prediction cache and worker processes are
+# swapped together as one ModelState when the model is reloaded
+MODEL_HOLDER = ModelHolder()
+
+# "threads" (default) or "processes": worker processes that each load the model
+# once, for multi-core throughput under sustained load
+_settings = load_user_settings()
+INFERENCE_BACKEND = _settings.get("inference_backend", "threads")
+INFERENCE_PROCESSES = _settings.get("inference_processes") or None  # None = one per CPU core
+# Longer messages are classified on a head + tail excerpt (0 = no limit)
+MAX_MESSAGE_LENGTH = _settings.get("max_message_length", DEFAULT_MAX_MESSAGE_LENGTH)
+if not isinstance(MAX_MESSAGE_LENGTH, int) or isinstance(MAX_MESSAGE_LENGTH, bool) or MAX_MESSAGE_LENGTH < 0:
+    print(f"WARNING: Invalid max_message_length {MAX_MESSAGE_LENGTH!r} in user settings; "
+          f"using {DEFAULT_MAX_MESSAGE_LENGTH}.")
+    MAX_MESSAGE_LENGTH = DEFAULT_MAX_MESSAGE_LENGTH
+# SMS waiting for classification (0 = unbounded) and what happens when that many are waiting:
+# "reject" answers phones 503, "block" holds the network thread until there is room (then 503),
+# "drop_oldest" discards the oldest waiting SMS
+INGEST_QUEUE_CAPACITY = _settings.get("ingest_queue_capacity", 10000)
+INGEST_QUEUE_POLICY = _settings.get("ingest_queue_policy", REJECT)
+if not isinstance(INGEST_QUEUE_CAPACITY, int) or INGEST_QUEUE_CAPACITY < 0:
+    print(f"WARNING: Invalid ingest_queue_capacity {INGEST_QUEUE_CAPACITY!r} in user settings; using 10000.")
+    INGEST_QUEUE_CAPACITY = 10000
+if INGEST_QUEUE_POLICY not in INGEST_QUEUE_POLICIES:
+    print(f"WARNING: Unknown ingest_queue_policy {INGEST_QUEUE_POLICY!r} in user settings "
+          f"(expected one of {', '.join(INGEST_QUEUE_POLICIES)}); using {REJECT!r}.")
+    INGEST_QUEUE_POLICY = REJECT
+# On exit, how long the SMS already received get to be classified and logged (seconds),
+# checked every CLOSE_POLL_MS while the window stays responsive
+CLOSE_TIMEOUT = 10.0
+CLOSE_POLL_MS = 100
+
+
+def new_prediction_cache():
+    """Identical campaign SMS are cleaned, vectorized and predicted only once per model version."""
+    return PredictionCache(max_entries=4096, max_bytes=32 * 1024 * 1024)
+
+
+def build_model_state(fallback_to_joblib=True):
+    """
+    Load the model: the bundle if present, else the joblib files.
+
+    Returns a new ModelState without publishing it; raises if no usable model
+    can be loaded. On reload a broken bundle is an error rather than a reason
+    to fall back to the (older) joblib files. If the joblib files were
+    replaced since the bundle was exported (a retrained model dropped in
+    place), they are loaded instead of the out-of-date bundle.
+    """
+    if os.path.exists(MODEL_BUNDLE_PATH):
+        try:
+            if bundle_is_stale(MODEL_BUNDLE_PATH, MODEL_PATH, VECTORIZER_PATH):
+                print(f"WARNING: '{MODEL_PATH}' or '{VECTORIZER_PATH}' changed since '{MODEL_BUNDLE_PATH}' "
+                      "was exported; loading them instead. Run model/export_bundle.py to rebuild the bundle.")
+            else:
+                # Only the header is read; the arrays are paged in on use. Windows
+                # cannot replace a mapped file, so there it is read into memory.
+                bundle = load_bundle(MODEL_BUNDLE_PATH, mmap=os.name != "nt")
+                return ModelState(
+                    bundle.scorer, bundle.fused_scorer, bundle.labels,
+                    version=bundle.model_version,
+                    fused_scorer=bundle.fused_scorer,
+                    cache=new_prediction_cache()
+                )
+        except Exception as e:
+            if not fallback_to_joblib:
+                raise
+            print(f"WARNING: Failed to load model bundle '{MODEL_BUNDLE_PATH}', trying joblib files:\n{e}")
 
-def load_model():
-    """Load the ML model and vectorizer."""
-    global MODEL, VECTORIZER
-    
     if not os.path.exists(MODEL_PATH):
-        print(f"WARNING: Model file '{MODEL_PATH}' not found. Prediction disabled.")
-        return False
-    
+        raise FileNotFoundError(f"Model file '{MODEL_PATH}' not found.")
+
+    import joblib  # pulls in sklearn when unpickling; kept off the startup path
+    # Linear SVC -> primal weights: predict becomes one sparse dot product
+    model = to_linear_scorer(joblib.load(MODEL_PATH))
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    modified = time.strftime("%Y%m%d-%H%M%S", time.localtime(os.path.getmtime(MODEL_PATH)))
+    return ModelState(
+        model, vectorizer, DEFAULT_LABELS,
+        version=f"joblib-{modified}",
+        fused_scorer=build_fused_scorer(vectorizer, model),
+        cache=new_prediction_cache()
+    )
+
+
+def load_model():
+    """Load the ML model and vectorizer at startup."""
     try:
-        MODEL = joblib.load(MODEL_PATH)
-        VECTORIZER = joblib.load(VECTORIZER_PATH)
+        MODEL_HOLDER.swap(build_model_state())
         return True
+    except FileNotFoundError:
+        print(f"WARNING: Model file '{MODEL_PATH}' not found. Prediction disabled.")
+        return False
     except Exception as e:
         print(f"WARNING: Failed to load model bundle:\n{e}")
         return False
 
 
-load_model()
+# ============================================================== #
+#                    BACKGROUND LOADING & WARM-UP                #
+# ============================================================== #
+
+WARMUP_MESSAGE = "URGENT: your account is locked, verify now at http://example.com or call 07700 900123"
+
+model_loader = None
+model_reloader = None
+
+
+def validate_model(state):
+    """Run one prediction through a model; raises ValueError if it is unusable."""
+    if len(state.labels) != len(state.model.classes_):
+        raise ValueError(f"{len(state.labels)} label names for {len(state.model.classes_)} classes")
+    result = classify_message(WARMUP_MESSAGE, state.model, state.vectorizer, state.labels,
+                              fused_scorer=state.fused_scorer)
+    if result.scores is not None and not np.all(np.isfinite(result.scores)):
+        raise ValueError("model produced non-finite decision scores")
+
+
+def warm_up_prediction():
+    """Run one throw-away prediction so the first real message is not cold."""
+    state = MODEL_HOLDER.current
+    if state is None:
+        return
+    validate_model(state)
+
+
+def start_process_engine(state=None):
+    """Spawn the classification worker processes (inference_backend = "processes")."""
+    state = state or MODEL_HOLDER.current
+    if state is None:
+        return
+    try:
+        state.engine = ProcessClassifier(
+            MODEL_PATH, VECTORIZER_PATH, state.labels,
+            processes=INFERENCE_PROCESSES,
+            cache=state.cache,
+            shared_scorer=state.fused_scorer,  # workers map the weights instead of loading them
+            max_length=MAX_MESSAGE_LENGTH
+        ).start()
+    except Exception as e:
+        state.engine = None
+        print(f"WARNING: Worker processes could not be started, using threads:\n{e}")
+
+
+def reload_model():
+    """Load, validate and (if enabled) start workers for a new model, off the GUI thread."""
+    state = build_model_state(fallback_to_joblib=False)
+    validate_model(state)
+    if INFERENCE_BACKEND == "processes":
+        start_process_engine(state)
+    return state
+
+
+def start_model_reloader(ui_components):
+    """
+    Watch the model files and hot-swap a retrained model without a restart.
+
+    Also reloads on F5. Predictions already running finish on the old model;
+    the TCP server and connected phones are not touched.
+    """
+    global model_reloader
+    root = ui_components['root']
+
+    def on_loaded(state):
+        old_state = MODEL_HOLDER.swap(state)
+        old_version = old_state.version if old_state is not None else "none"
+        root.after(0, lambda: ui_components['status_bar'].configure(
+            text=f"🔄 Model updated: {old_version} → {state.version}"
+        ))
+
+    def on_error(error):
+        print(f"WARNING: Model reload failed, keeping the current model:\n{error}")
+        root.after(0, lambda: ui_components['status_bar'].configure(
+            text=f"⚠️ Model reload failed: {error}"
+        ))
+
+    def on_reload_key(event=None):
+        ui_components['status_bar'].configure(text="🔄 Reloading model...")
+        model_reloader.request_reload()
+
+    model_reloader = ModelReloader(
+        (MODEL_BUNDLE_PATH, MODEL_PATH, VECTORIZER_PATH),
+        reload_model, on_loaded, on_error
+    ).start()
+    root.bind("<F5>", on_reload_key)
+    return model_reloader
+
+
+def start_model_loading():
+    """Load model, vectorizer and NLP resources on a background thread."""
+    global model_loader
+    steps = [
+        ("Loading model", load_model),
+        ("Loading language tools", warm_up),
+        ("Warming up", warm_up_prediction),
+    ]
+    if INFERENCE_BACKEND == "processes":
+        steps.append(("Starting worker processes", start_process_engine))
+    model_loader = BackgroundLoader(steps).start()
+    return model_loader
+
+
+def is_model_loading():
+    return model_loader is not None and not model_loader.finished
+
+
+def wait_for_model():
+    """Block (off the GUI thread) until background loading has finished."""
+    if model_loader is not None:
+        model_loader.wait()
 
 # ============================================================== #
 #                    GLOBAL STATE                                #
 # ============================================================== #
 
 network_manager = None
+inference_pool = None
 details_dict = {}
 
 def add_detail(detail_name, detail):
@@ -112,16 +315,6 @@ def show_error_popup(parent, title, message):
 #                    CORE PREDICTION LOGIC                       #
 # ============================================================== #
 
-def extract_features(text):
-    """Extract URLs, emails, phone numbers, and domains from text."""
-    return {
-        'urls': detect_urls(text),
-        'emails': detect_emails(text),
-        'phones': detect_phone_numbers(text),
-        'domains': detect_domains(text)
-    }
-
-
 def build_warnings_list(features):
     """Build a list of warning messages from extracted features."""
     warnings = []
@@ -138,6 +331,26 @@ def build_warnings_list(features):
     return warnings
 
 
+def classify_messages(messages, batch_size=256):
+    """
+    Classify many raw messages at once (e.g. a backlog from a phone).
+
+    UI-free wrapper around classify_batch with the currently loaded model;
+    returns one Classification (label, scores, features, ...) per message.
+    """
+    state = MODEL_HOLDER.acquire()
+    if state is None:
+        raise ModelNotLoadedError("the prediction model is not loaded")
+    try:
+        return classify_batch(
+            messages, state.model, state.vectorizer, state.labels,
+            cache=state.cache, batch_size=batch_size, fused_scorer=state.fused_scorer,
+            max_length=MAX_MESSAGE_LENGTH
+        )
+    finally:
+        state.release()
+
+
 def get_label_color(label):
     """Get color code based on classification label."""
     label_lower = label.lower()
@@ -150,14 +363,33 @@ def get_label_color(label):
         return "#4caf50"
 
 
-def process_message_for_prediction(sms, sender="Unknown", ui_components=None):
+# One queued message: raw text plus the sender/device details it arrived with.
+PredictionJob = namedtuple("PredictionJob", ["text", "sender", "details"])
+
+
+class ModelNotLoadedError(RuntimeError):
+    pass
+
+
+def process_message_for_prediction(sms, sender="Unknown", ui_components=None, details=None, force=False):
     """
-    Core logic for cleaning, predicting, and logging a message.
+    Queue a message for cleaning and prediction on the inference pool.
+
+    Safe to call from any thread. Classification runs on the worker threads;
+    verification and logging happen on the Tk main loop, in arrival order.
+    Messages arriving while the model is still loading in the background wait
+    in the pool's queue until loading finishes. Raises QueueFull if that
+    queue is full, unless force is set.
     
     Args:
         sms: Either a dict with 'sender' and 'message' keys, or a string
         sender: Sender identifier (default: "Unknown")
         ui_components: Dictionary of UI components
+        details: user_phone/device_name/sent_time for this message
+                 (default: the current details)
+        force: queue it even if the queue is full (manual input)
+
+    Returns the job's sequence number in the pool.
     """
     # Parse input
     if isinstance(sms, dict):
@@ -166,56 +398,126 @@ def process_message_for_prediction(sms, sender="Unknown", ui_components=None):
     else:
         text = sms
 
-    # Validate model
-    if MODEL is None or VECTORIZER is None:
+    return inference_pool.submit(PredictionJob(text, sender, dict(details or details_dict)), force)
+
+
+def process_messages_for_prediction(sms_messages):
+    """
+    Queue a backlog of network SMS (receiver dicts) for prediction, in order.
+
+    The jobs enter the pool back to back, so the workers take them in
+    batches of up to max_batch through classify_batch. Returns their
+    sequence numbers; raises QueueFull (none queued) if they do not fit.
+    """
+    return inference_pool.submit_many([
+        PredictionJob(sms['message'], sms['sender'], {
+            "user_phone": sms['phoneNumber'],
+            "device_name": sms['deviceName'],
+            "sent_time": sms['time'],
+        })
+        for sms in sms_messages
+    ])
+
+
+def classify_jobs(jobs):
+    """
+    Worker-side prediction for a batch of PredictionJobs; no UI access here.
+
+    With the process backend the batch is shipped to the worker processes.
+    Otherwise a single message takes the fused fast path and a burst goes
+    through one classify_batch call. The whole batch uses the model that was
+    current when it started, even if a reload swaps in a new one meanwhile;
+    returns (Classification, model version) per job.
+    """
+    wait_for_model()
+    state = MODEL_HOLDER.acquire()
+    if state is None:
+        raise ModelNotLoadedError("the prediction model is not loaded")
+
+    try:
+        texts = [job.text for job in jobs]
+        if state.engine is not None:
+            results = state.engine.classify(texts)
+        elif len(jobs) == 1:
+            results = [classify_message(
+                texts[0], state.model, state.vectorizer, state.labels,
+                cache=state.cache, fused_scorer=state.fused_scorer, max_length=MAX_MESSAGE_LENGTH
+            )]
+        else:
+            results = classify_batch(
+                texts, state.model, state.vectorizer, state.labels,
+                cache=state.cache, fused_scorer=state.fused_scorer, max_length=MAX_MESSAGE_LENGTH
+            )
+    finally:
+        state.release()
+    return [(result, state.version) for result in results]
+
+
+def log_prediction(job, outcome, ui_components, verify=True):
+    """Tk-thread half of a prediction: user verification (unless verify is False) and logging."""
+    result, model_version = outcome
+    text, sender = job.text, job.sender
+    label_display = "Legit" if result.label.lower() == "ham" else result.label.capitalize()
+    
+    # User verification for suspicious messages
+    if verify and label_display != "Legit":
+        verifier = UserVerification(ui_components['root'], text, label_display)
+        label_display = verifier.ask_user(sender)
+    
+    # Build warnings and entry data
+    warnings_list = build_warnings_list(result.features)
+    color = get_label_color(label_display)
+    
+    entry_data = {
+        "message": text,
+        "label": label_display,
+        "warnings": warnings_list,
+        "sender": sender,
+        "user_phone": job.details.get("user_phone", "Unknown"),
+        "device_name": job.details.get("device_name", "Unknown"),
+        "sent_time": job.details.get("sent_time", "Unknown"),
+        "model_version": model_version
+    }
+    
+    # Log the result
+    ui_components['add_log_message'](label_display, text, color, entry_data)
+    ui_components['status_bar'].configure(text=f"✅ Analyzed: {label_display}")
+
+
+def log_prediction_error(job, error, ui_components):
+    """Tk-thread handler for a failed prediction."""
+    if isinstance(error, JobDropped):
+        # Expected under the drop_oldest policy; counted in the network window, no popup per SMS
+        ui_components['status_bar'].configure(text=f"⚠️ Queue full: dropped a message from {job.sender}")
+        return
+
+    if isinstance(error, ModelNotLoadedError):
         show_error_popup(
             parent=ui_components['root'],
             title="Model Not Loaded",
-            message=f"Received message from {sender}, but the prediction model is not loaded."
+            message=f"Received message from {job.sender}, but the prediction model is not loaded."
         )
         return
 
-    # Extract features
-    features = extract_features(text)
-    text_clean = clean_text(text)
-    labels = ['ham', 'smishing', 'spam']
-    
-    try:
-        # Predict
-        X = VECTORIZER.transform([text_clean])
-        label_idx = MODEL.predict(X)[0]
-        label = labels[label_idx]
-        label_display = "Legit" if label.lower() == "ham" else label.capitalize()
-        
-        # User verification for suspicious messages
-        if label_display != "Legit":
-            verifier = UserVerification(ui_components['root'], text, label_display)
-            label_display = verifier.ask_user(sender)
-        
-        # Build warnings and entry data
-        warnings_list = build_warnings_list(features)
-        color = get_label_color(label_display)
-        
-        entry_data = {
-            "message": text,
-            "label": label_display,
-            "warnings": warnings_list,
-            "sender": sender,
-            "user_phone": details_dict.get("user_phone", "Unknown"),
-            "device_name": details_dict.get("device_name", "Unknown"),
-            "sent_time": details_dict.get("sent_time", "Unknown")
-        }
-        
-        # Log the result
-        ui_components['add_log_message'](label_display, text, color, entry_data)
-        ui_components['status_bar'].configure(text=f"✅ Analyzed: {label_display}")
-        
-    except Exception as e:
-        show_error_popup(
-            parent=ui_components['root'],
-            title="Prediction Failed",
-            message=f"Prediction failed for message from {sender}: {e}"
-        )
+    show_error_popup(
+        parent=ui_components['root'],
+        title="Prediction Failed",
+        message=f"Prediction failed for message from {job.sender}: {error}"
+    )
+
+
+def start_inference_pool(ui_components):
+    """Start the classification workers (one per CPU core) feeding results back to Tk."""
+    global inference_pool
+    inference_pool = InferencePool(
+        ui_components['root'],
+        classify_jobs,
+        lambda job, result: log_prediction(job, result, ui_components),
+        lambda job, error: log_prediction_error(job, error, ui_components),
+        capacity=INGEST_QUEUE_CAPACITY,
+        policy=INGEST_QUEUE_POLICY
+    ).start()
+    return inference_pool
 
 # ============================================================== #
 #                    UI ACTION HANDLERS                          #
@@ -229,7 +531,7 @@ def predict_action(ui_components):
         messagebox.showwarning("Warning", "Enter a message first")
         return
 
-    if MODEL is None or VECTORIZER is None:
+    if not is_model_loading() and MODEL_HOLDER.current is None:
         show_error_popup(
             parent=ui_components['root'],
             title="Error",
@@ -237,7 +539,13 @@ def predict_action(ui_components):
         )
         return
 
-    process_message_for_prediction(text, sender="Manual Input", ui_components=ui_components)
+    if is_model_loading():
+        ui_components['status_bar'].configure(
+            text=f"⏳ Model loading... {inference_pool.pending + 1} message(s) queued"
+        )
+
+    # A message typed by the user is never refused because phones filled the queue
+    process_message_for_prediction(text, sender="Manual Input", ui_components=ui_components, force=True)
 
 
 def clear_input_action(ui_components):
@@ -270,6 +578,8 @@ def load_image_action(ui_components):
         ui_components['status_bar'].configure(text="✅ Text extracted from image")
 
     try:
+        # OpenCV & Tesseract are only loaded the first time OCR is used
+        from components.sms_cropper import SMSCropper
         SMSCropper(ui_components['root'], file_path, insert_text)
     except Exception as e:
         show_error_popup(
@@ -283,18 +593,54 @@ def load_image_action(ui_components):
 # ============================================================== #
 
 def on_sms_received_callback(sms_message, ui_components):
-    """Callback when SMS is received via network."""
+    """
+    Callback when SMS is received via network.
+
+    Runs on the network thread: the message goes straight to the inference
+    pool instead of through the Tk event loop. Returns the job id the phone
+    gets back; raises RequestRejected (503) if the model failed to load or
+    the ingest queue is full.
+    """
+    if MODEL_HOLDER.current is None and not is_model_loading():
+        raise RequestRejected(503, "the prediction model is not loaded", retry_after=30)
+
     take_details(
         sms_message['phoneNumber'],
         sms_message['deviceName'],
         sms_message['time']
     )
     
-    process_message_for_prediction(
-        sms_message['message'],
-        sender=sms_message['sender'],
-        ui_components=ui_components
-    )
+    try:
+        return process_message_for_prediction(
+            sms_message['message'],
+            sender=sms_message['sender'],
+            ui_components=ui_components,
+            details={
+                "user_phone": sms_message['phoneNumber'],
+                "device_name": sms_message['deviceName'],
+                "sent_time": sms_message['time']
+            }
+        )
+    except QueueFull as e:
+        raise RequestRejected(503, f"too many messages waiting: {e}", retry_after=1)
+
+
+def on_sms_batch_received_callback(sms_messages, ui_components):
+    """
+    Callback when a phone uploads several SMS in one request (JSON array or NDJSON).
+
+    Runs on the network thread like on_sms_received_callback; returns one
+    job id per message.
+    """
+    if MODEL_HOLDER.current is None and not is_model_loading():
+        raise RequestRejected(503, "the prediction model is not loaded", retry_after=30)
+    if sms_messages:
+        latest = sms_messages[-1]
+        take_details(latest['phoneNumber'], latest['deviceName'], latest['time'])
+    try:
+        return process_messages_for_prediction(sms_messages)
+    except QueueFull as e:
+        raise RequestRejected(503, f"too many messages waiting: {e}", retry_after=1)
 
 
 class NetworkConnectWindow(ctk.CTkToplevel):
@@ -323,6 +669,7 @@ class NetworkConnectWindow(ctk.CTkToplevel):
             manager.set_ui_update_callback(self.update_status)
         
         self.update_status("Stopped")
+        self._refresh_queue_stats()
 
     def _get_local_ip(self):
         """Get the local IP address of the machine."""
@@ -353,6 +700,14 @@ class NetworkConnectWindow(ctk.CTkToplevel):
         )
         self.status_label.pack(pady=10)
 
+        # Ingest queue depth and overflow counts
+        self.queue_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=12)
+        )
+        self.queue_label.pack(pady=(0, 5))
+
         # Start/Stop Button
         self.toggle_btn = ctk.CTkButton(
             self,
@@ -395,6 +750,9 @@ class NetworkConnectWindow(ctk.CTkToplevel):
     def _generate_qr_code(self):
         """Generate QR code for connection URL."""
         try:
+            import qrcode
+            from PIL import ImageTk
+
             qr = qrcode.QRCode(
                 version=1,
                 error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -442,6 +800,20 @@ class NetworkConnectWindow(ctk.CTkToplevel):
                 hover_color="#218838"
             )
 
+    def _refresh_queue_stats(self):
+        """Show how many SMS are waiting for classification, every half second while open."""
+        if not self.winfo_exists():
+            return
+        queue = getattr(self.manager, 'ingest_queue', None)
+        if queue is not None:
+            stats = queue.stats()
+            capacity = stats.capacity if stats.capacity is not None else "∞"
+            self.queue_label.configure(
+                text=f"Queue: {stats.depth}/{capacity} (peak {stats.high_water}) · "
+                     f"rejected {stats.rejected} · dropped {stats.dropped}"
+            )
+        self.after(500, self._refresh_queue_stats)
+
     def _toggle_server(self):
         """Toggle server state between running and stopped."""
         if not self.manager:
@@ -476,7 +848,10 @@ def manage_server_action(ui_components):
     if network_manager is None:
         try:
             def wrapped_callback(sms_msg):
-                on_sms_received_callback(sms_msg, ui_components)
+                return on_sms_received_callback(sms_msg, ui_components)
+
+            def wrapped_batch_callback(sms_msgs):
+                return on_sms_batch_received_callback(sms_msgs, ui_components)
             
             def wrapped_log(msg, label):
                 ui_components['status_bar'].configure(text=f"{label}: {msg}")
@@ -484,7 +859,10 @@ def manage_server_action(ui_components):
             network_manager = NetworkSMSReceiver(
                 ui_components['root'],
                 wrapped_callback,
-                wrapped_log
+                wrapped_log,
+                callback_on_ui_thread=False,
+                batch_callback=wrapped_batch_callback,
+                ingest_queue=inference_pool.ingest_queue
             )
         except Exception as e:
             show_error_popup(
@@ -522,7 +900,8 @@ def save_logs_to_file(file_path, ui_components):
                 f.write(f"Sender: {entry.get('sender', 'Unknown')}\n")
                 f.write(f"User Phone: {entry.get('user_phone', 'Unknown')}\n")
                 f.write(f"Device: {entry.get('device_name', 'Unknown')}\n")
-                f.write(f"Time: {entry.get('sent_time', 'Unknown')}\n\n")
+                f.write(f"Time: {entry.get('sent_time', 'Unknown')}\n")
+                f.write(f"Model Version: {entry.get('model_version', 'Unknown')}\n\n")
                 f.write("Message:\n")
                 f.write("-" * 80 + "\n")
                 f.write(entry.get('message', 'N/A') + "\n")
@@ -548,11 +927,11 @@ def save_logs_to_file(file_path, ui_components):
 
 def on_closing(ui_components):
     """Handle application closing with conditional save prompt."""
-    global network_manager
-    
     settings = load_user_settings()
     auto_save = settings.get("auto_save", "off")
-    has_logs = hasattr(builtins, '_shared_log_entries') and builtins._shared_log_entries
+    has_logs = (hasattr(builtins, '_shared_log_entries') and builtins._shared_log_entries) or \
+        (inference_pool is not None and inference_pool.pending)
+    save_path = None
     
     if has_logs:
         if auto_save == "on":
@@ -565,7 +944,7 @@ def on_closing(ui_components):
             )
             
             if file_path:
-                save_logs_to_file(file_path, ui_components)
+                save_path = file_path
             else:
                 result = messagebox.askyesno(
                     "Exit Without Saving?",
@@ -585,22 +964,63 @@ def on_closing(ui_components):
             )
             
             if result is True:
-                file_path = filedialog.asksaveasfilename(
+                save_path = filedialog.asksaveasfilename(
                     defaultextension=".txt",
                     filetypes=[("Text Files", "*.txt")],
                     title="Save Predictions",
                     initialfile="sms_logs.txt"
                 )
-                if file_path:
-                    save_logs_to_file(file_path, ui_components)
             elif result is None:
                 return
+
+    finish_closing(ui_components, save_path)
+
+
+def finish_closing(ui_components, save_path=None):
+    """
+    Exit once the SMS phones already sent are logged, then save the logs (if save_path).
+
+    Runs only after the user confirmed exit. The server is stopped on a
+    thread (stop_server waits for the ingest queue to drain) and the pool
+    keeps delivering results through its own poll, so the window stays
+    responsive. These last results are logged without the verification
+    dialog. After CLOSE_TIMEOUT seconds the app exits regardless.
+    """
+    root = ui_components['root']
+    root.protocol("WM_DELETE_WINDOW", lambda: None)  # already closing
+    ui_components['status_bar'].configure(text="⏳ Finishing received messages before exit...")
     
-    # Stop network manager
-    if network_manager and isinstance(network_manager, NetworkSMSReceiver):
-        network_manager.stop_server()
-    
-    ui_components['root'].destroy()
+    stopping = None
+    if isinstance(network_manager, NetworkSMSReceiver) and network_manager.is_running:
+        stopping = threading.Thread(target=network_manager.stop_server, daemon=True, name="Network-Stop")
+        stopping.start()
+    if inference_pool is not None:
+        inference_pool.result_fn = lambda job, outcome: log_prediction(job, outcome, ui_components, verify=False)
+        inference_pool.error_fn = lambda job, error: print(
+            f"WARNING: Prediction failed for message from {job.sender}: {error}"
+        )
+    deadline = time.monotonic() + CLOSE_TIMEOUT
+
+    def wait_and_exit():
+        pending = inference_pool.pending if inference_pool is not None else 0
+        busy = pending or (stopping is not None and stopping.is_alive())
+        if busy and time.monotonic() < deadline:
+            root.after(CLOSE_POLL_MS, wait_and_exit)
+            return
+        if busy:
+            print(f"WARNING: Exiting with {pending} received message(s) not yet classified.")
+        
+        if save_path:
+            save_logs_to_file(save_path, ui_components)
+        if model_reloader is not None:
+            model_reloader.stop()
+        if inference_pool is not None:
+            inference_pool.shutdown(wait=False)
+        MODEL_HOLDER.swap(None)  # stops worker processes once running predictions finish
+        
+        root.destroy()
+
+    wait_and_exit()
 
 # ============================================================== #
 #                    MAIN APPLICATION ENTRY                      #
@@ -608,6 +1028,9 @@ def on_closing(ui_components):
 
 def main():
     """Main application entry point."""
+    # Load model & NLP in the background while the UI and intro screen come up
+    loader = start_model_loading()
+
     # Build UI
     ui_components = build_ui()
     
@@ -631,12 +1054,18 @@ def main():
         lambda: on_closing(ui_components)
     )
     
-    # Show intro screen
-    IntroScreen(ui_components['root'], duration=3000)
+    # Classification runs on worker threads; results come back to the main loop
+    start_inference_pool(ui_components)
+    # Retrained models are picked up without restarting (or on F5)
+    start_model_reloader(ui_components)
+
+    # Show intro screen until background loading has finished
+    IntroScreen(ui_components['root'], progress_source=loader.snapshot)
     
     # Start the application
     ui_components['root'].mainloop()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # worker processes in the PyInstaller build
     main()
\ No newline at end of file
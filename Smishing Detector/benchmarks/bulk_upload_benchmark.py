@@ -0,0 +1,174 @@
+"""
+Backlog upload: one request per SMS vs one JSON array or NDJSON request.
+
+A phone that was offline uploads a backlog of SMS from
+model/sms_data_corrected.csv to a NetworkSMSReceiver on loopback. This
+reports, per backlog size, the time until the phone has every answer:
+
+- one keep-alive request per SMS, each waiting for its response;
+- the whole backlog as one JSON array;
+- the whole backlog as NDJSON.
+
+For the bulk requests it checks that the results come back one per record
+and in order, including an {"error": ...} for a record that is not an SMS
+object or whose message is not a string (a single such SMS gets a 400,
+the same as a body that is not JSON). Without a batch_callback, an sms_callback that refuses part-way
+must leave the records it took with their ids and mark only the rest, so
+that resending those does not duplicate any SMS. It then classifies the uploaded backlog with the shipped bundle,
+one classify_message per SMS vs one classify_batch call, which is the path
+the app's batch_callback feeds. Exits with status 1 if a result is missing
+or out of order. Run from the 'Smishing Detector' folder:
+
+    python benchmarks/bulk_upload_benchmark.py
+"""
+import csv
+import json
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.loopback import read_responses, sms_request, start_receiver
+from components.network_sms_receiver import RequestRejected
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+BUNDLE_PATH = 'model/sms_model.bundle'
+BACKLOG_SIZES = (10, 100, 1000)
+# Records the receiver must answer with {"error": ...}: not an object, and a non-text message
+INVALID_RECORDS = ("not a record", {"message": 42, "sender": "+905550000000"})
+
+
+def records(messages):
+    return [
+        {"message": text, "sender": f"+90555{i:07d}", "phoneNumber": "+905550000000",
+         "deviceName": "Pixel", "timestamp": 1700000000000 + i}
+        for i, text in enumerate(messages)
+    ]
+
+
+def upload(address, requests, count):
+    """Seconds until every response arrived; returns (seconds, responses)."""
+    with socket.create_connection(address) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        start = time.perf_counter()
+        responses = []
+        for request in requests:
+            sock.sendall(request)
+            if count == len(requests):  # one SMS per request: wait for each answer
+                responses.extend(read_responses(sock, 1))
+        if count != len(requests):
+            responses = read_responses(sock, 1)
+        return time.perf_counter() - start, responses
+
+
+def check_bulk(responses, expected_ids, failures, name):
+    if len(responses) != 1 or responses[0][0] != 200:
+        failures.append(f"{name}: expected one 200 response")
+        return
+    results = json.loads(responses[0][2])["results"]
+    if results != [{"id": i} if i is not None else {"error": "not an SMS object"} for i in expected_ids]:
+        failures.append(f"{name}: results missing or out of order")
+
+
+def check_partial_refusal(failures):
+    taken = []
+
+    def on_sms(message):
+        if len(taken) >= 3:
+            raise RequestRejected(503, "queue full", retry_after=1)
+        taken.append(message["message"])
+        return len(taken) - 1
+
+    receiver, address = start_receiver(on_sms, rate_limit=None)
+    backlog = records([f"sms {i}" for i in range(5)])
+    _, responses = upload(address, [sms_request(json.dumps(backlog).encode())], 1)
+    results = json.loads(responses[0][2])["results"] if responses and responses[0][0] == 200 else None
+    if results != [{"id": 0}, {"id": 1}, {"id": 2}] + [{"error": "queue full"}] * 2:
+        failures.append(f"partial refusal: got {responses}")
+    else:
+        taken.clear()  # room again: resend only the refused records
+        resend = [record for record, result in zip(backlog, results) if "error" in result]
+        upload(address, [sms_request(json.dumps(resend).encode())], 1)
+        if taken != ["sms 3", "sms 4"]:
+            failures.append(f"partial refusal: resend delivered {taken}")
+    taken.extend([None] * 3)  # full: the first record is refused, so the whole upload is
+    _, responses = upload(address, [sms_request(json.dumps(backlog).encode())], 1)
+    if [status for status, _, _ in responses] != [503]:
+        failures.append(f"refused upload: expected 503, got {responses}")
+    receiver.stop_server()
+    print("partial refusal: taken records keep their ids, only the rest are marked")
+
+
+def main():
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        messages = [row['TEXT'] for row in csv.DictReader(f)]
+    uploaded = []
+
+    def on_sms(message):
+        uploaded.append(message["message"])
+        return len(uploaded) - 1
+
+    def on_batch(batch):
+        first = len(uploaded)
+        uploaded.extend(message["message"] for message in batch)
+        return list(range(first, len(uploaded)))
+
+    receiver, address = start_receiver(on_sms, rate_limit=None, batch_callback=on_batch)
+    failures = []
+    print(f"{'backlog':>8} {'per-SMS ms':>11} {'array ms':>9} {'NDJSON ms':>10}")
+    for size in BACKLOG_SIZES:
+        backlog = records(messages[:size])
+        per_sms, _ = upload(address, [sms_request(json.dumps(r).encode()) for r in backlog], size)
+
+        # Records that are not valid SMS sit in the middle of the bulk bodies
+        bulk = backlog[:size // 2] + list(INVALID_RECORDS) + backlog[size // 2:]
+        first = len(uploaded)
+        array_time, responses = upload(address, [sms_request(json.dumps(bulk).encode())], 1)
+        ids = iter(range(first, first + size))
+        check_bulk(responses, [None if r in INVALID_RECORDS else next(ids) for r in bulk], failures, "array")
+
+        first = len(uploaded)
+        ndjson = "\n".join(json.dumps(r) for r in bulk).encode()
+        ndjson_time, responses = upload(address, [sms_request(ndjson)], 1)
+        ids = iter(range(first, first + size))
+        check_bulk(responses, [None if r in INVALID_RECORDS else next(ids) for r in bulk], failures, "NDJSON")
+
+        print(f"{size:>8} {per_sms * 1000:>11.1f} {array_time * 1000:>9.1f} {ndjson_time * 1000:>10.1f}")
+    count = len(uploaded)
+    _, responses = upload(address, [sms_request(json.dumps(INVALID_RECORDS[1]).encode())], 1)
+    if [status for status, _, _ in responses] != [400] or len(uploaded) != count:
+        failures.append(f"single SMS with a non-text message: expected 400, got {responses}")
+    receiver.stop_server()
+    if uploaded[-BACKLOG_SIZES[-1]:] != messages[:BACKLOG_SIZES[-1]]:
+        failures.append("uploaded messages differ from the backlog")
+
+    check_partial_refusal(failures)
+
+    from components.classifier import classify_batch, classify_message
+    from components.model_bundle import load_bundle
+    from components.preprocess import warm_up
+    bundle = load_bundle(BUNDLE_PATH)
+    warm_up()
+    backlog = messages[:BACKLOG_SIZES[-1]]
+    start = time.perf_counter()
+    one_by_one = [classify_message(text, bundle.scorer, None, bundle.labels, fused_scorer=bundle.fused_scorer)
+                  for text in backlog]
+    single_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = classify_batch(backlog, bundle.scorer, None, bundle.labels, fused_scorer=bundle.fused_scorer)
+    batch_time = time.perf_counter() - start
+    print(f"\nclassify {len(backlog)} uploaded SMS: classify_message {single_time * 1000:.0f} ms, "
+          f"classify_batch {batch_time * 1000:.0f} ms ({single_time / batch_time:.1f}x)")
+    if [r.label for r in one_by_one] != [r.label for r in batched]:
+        failures.append("classify_batch labels differ from classify_message")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: one result per record, in order")
+
+
+if __name__ == '__main__':
+    main()
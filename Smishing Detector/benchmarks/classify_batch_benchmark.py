@@ -0,0 +1,51 @@
+"""
+Throughput of classify_batch on model/sms_data_corrected.csv.
+
+Reports messages per second for several batch sizes, without a cache and
+with a warm PredictionCache (the campaign case: the same texts again). Run
+from the 'Smishing Detector' folder:
+
+    python benchmarks/classify_batch_benchmark.py
+"""
+import csv
+import os
+import sys
+import time
+
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.classifier import classify_batch
+from components.linear_model import to_linear_scorer
+from components.prediction_cache import PredictionCache
+from components.preprocess import warm_up
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+LABELS = ['ham', 'smishing', 'spam']
+
+
+def run(messages, model, vectorizer, batch_size, cache=None):
+    start = time.perf_counter()
+    for i in range(0, len(messages), batch_size):
+        classify_batch(messages[i:i + batch_size], model, vectorizer, LABELS, cache=cache)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    model = to_linear_scorer(joblib.load('model/sms_model.joblib'))
+    vectorizer = joblib.load('model/tfidf_vectorizer.joblib')
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        messages = [row['TEXT'] for row in csv.DictReader(f)]
+    warm_up()
+
+    print(f"messages: {len(messages)}")
+    for batch_size in (1, 32, 256, 1024):
+        print(f"batch {batch_size:>5}: {run(messages, model, vectorizer, batch_size):9.0f} msg/s")
+
+    cache = PredictionCache(max_entries=len(messages) * 2)
+    run(messages, model, vectorizer, 256, cache)
+    print(f"batch   256, warm cache: {run(messages, model, vectorizer, 256, cache):9.0f} msg/s  {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
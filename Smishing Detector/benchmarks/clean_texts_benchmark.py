@@ -0,0 +1,43 @@
+"""
+Corpus preprocessing time: clean_text per message vs. clean_texts in bulk.
+
+Also checks that both produce identical output for every message. Run from
+the 'Smishing Detector' folder:
+
+    python benchmarks/clean_texts_benchmark.py [n_process ...]
+"""
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.preprocess import clean_text, clean_texts, load_spacy
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+
+
+def main():
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        texts = [row['TEXT'] for row in csv.DictReader(f)]
+    load_spacy()
+    print(f"messages: {len(texts)}")
+
+    start = time.perf_counter()
+    expected = [clean_text(text) for text in texts]
+    single = time.perf_counter() - start
+    print(f"clean_text loop:          {single:.2f} s")
+
+    mismatches = 0
+    for n_process in [int(arg) for arg in sys.argv[1:]] or [1, os.cpu_count() or 1]:
+        start = time.perf_counter()
+        got = list(clean_texts(texts, batch_size=256, n_process=n_process))
+        elapsed = time.perf_counter() - start
+        bad = sum(a != b for a, b in zip(expected, got))
+        mismatches += bad
+        print(f"clean_texts n_process={n_process:<3} {elapsed:.2f} s  ({single / elapsed:.1f}x, {bad} mismatches)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
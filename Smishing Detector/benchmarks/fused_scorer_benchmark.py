@@ -0,0 +1,82 @@
+"""
+sklearn transform + predict vs. the fused single-message scorer.
+
+For every cleaned message of model/sms_data_corrected.csv it checks that the
+fused path yields the same features and decision values (to float tolerance)
+and the same label as VECTORIZER.transform([text]) + MODEL.predict, and that
+feeding it the clean_tokens() list gives the same features as the joined
+text. Then it times the three paths one message at a time. Run from the
+'Smishing Detector' folder:
+
+    python benchmarks/fused_scorer_benchmark.py
+"""
+import csv
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.fused_scorer import FusedTfidfScorer
+from components.linear_model import to_linear_scorer
+from components.preprocess import clean_token_lists
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+TOLERANCE = 1e-9
+
+
+def main():
+    model = to_linear_scorer(joblib.load('model/sms_model.joblib'))
+    vectorizer = joblib.load('model/tfidf_vectorizer.joblib')
+    fused = FusedTfidfScorer.from_vectorizer(vectorizer, model)
+
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        token_lists = list(clean_token_lists(row['TEXT'] for row in csv.DictReader(f)))
+    texts = [' '.join(tokens) for tokens in token_lists]
+
+    X = vectorizer.transform(texts)
+    decisions = model.decision_function(X)
+    labels = model.predict(X)
+    feature_diff = decision_diff = 0.0
+    mismatches = 0
+    for i, text in enumerate(texts):
+        ids, values = fused.vectorize(text)
+        token_ids, token_values = fused.vectorize_tokens(token_lists[i])
+        if not (np.array_equal(ids, token_ids) and np.array_equal(values, token_values)):
+            mismatches += 1
+            continue
+        row = X[i]
+        order = np.argsort(ids)
+        if not np.array_equal(ids[order], np.sort(row.indices)):
+            mismatches += 1
+            continue
+        feature_diff = max(feature_diff, np.abs(values[order] - row.data[np.argsort(row.indices)]).max(initial=0))
+        decision_diff = max(decision_diff, np.abs(fused.decision_function(text) - decisions[i]).max())
+        mismatches += fused.predict(text) != labels[i]
+
+    start = time.perf_counter()
+    for text in texts:
+        model.predict(vectorizer.transform([text]))
+    sklearn_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        fused.predict(text)
+    fused_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for tokens in token_lists:
+        fused.predict_features(fused.vectorize_tokens(tokens))
+    tokens_time = time.perf_counter() - start
+
+    n = len(texts)
+    print(f"messages: {n}, label/feature mismatches: {mismatches}")
+    print(f"max |feature diff|: {feature_diff:.2e}, max |decision diff|: {decision_diff:.2e}")
+    print(f"transform + predict: {sklearn_time * 1e6 / n:7.1f} us/msg")
+    print(f"fused:               {fused_time * 1e6 / n:7.1f} us/msg  ({sklearn_time / fused_time:.1f}x)")
+    print(f"fused, token lists:  {tokens_time * 1e6 / n:7.1f} us/msg  ({sklearn_time / tokens_time:.1f}x)")
+    sys.exit(1 if mismatches or max(feature_diff, decision_diff) > TOLERANCE else 0)
+
+
+if __name__ == '__main__':
+    main()
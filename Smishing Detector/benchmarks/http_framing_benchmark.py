@@ -0,0 +1,174 @@
+"""
+Receiver framing: requests split across reads and packed into one read.
+
+Builds a stream of SMS POST requests: bodies from a few bytes to well past
+the old 1 KB read, framed with Content-Length or chunked
+Transfer-Encoding, some separated by blank lines. It reports:
+
+- how many messages the old one-recv(1024)-per-request receiver would
+  have recovered from that stream;
+- that HttpRequestParser recovers every body, whether the stream arrives
+  1 byte at a time, in random pieces or all at once, and its throughput;
+- the same stream sent over a loopback TCP connection to a running
+  NetworkSMSReceiver, and the 200 responses it sends back;
+- requests framed with neither header, as the phone app writes them: one
+  that closes the connection still gets a 200, one on a keep-alive
+  connection gets a 411 instead of swallowing the request after it.
+
+Exits with status 1 if any message is lost or corrupted. Run from the
+'Smishing Detector' folder:
+
+    python benchmarks/http_framing_benchmark.py [requests]
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.loopback import read_responses, start_receiver
+from components.http_framing import HttpRequestParser
+from components.network_sms_receiver import NetworkSMSReceiver
+
+OLD_BUFFER_SIZE = 1024
+
+
+def build_request(body, chunked, rng):
+    head = "POST /sms HTTP/1.1\r\nHost: receiver\r\nContent-Type: application/json\r\n"
+    if not chunked:
+        return f"{head}Content-Length: {len(body)}\r\n\r\n".encode() + body
+    pieces, pos = [], 0
+    while pos < len(body):
+        size = rng.randint(1, 700)
+        pieces.append(b"%x;ext=1\r\n" % len(body[pos:pos + size]) + body[pos:pos + size] + b"\r\n")
+        pos += size
+    return f"{head}Transfer-Encoding: chunked\r\n\r\n".encode() + b"".join(pieces) + b"0\r\nX-Trailer: 1\r\n\r\n"
+
+
+def build_stream(count, rng):
+    """(raw stream, list of (request bytes, SMS text))"""
+    requests = []
+    for i in range(count):
+        text = f"msg {i}: " + "".join(rng.choice("abc xyz.0123") for _ in range(rng.choice((20, 150, 900, 3000))))
+        body = json.dumps({"message": text, "sender": f"+90555{i:07d}", "timestamp": 1700000000000}).encode()
+        raw = build_request(body, chunked=rng.random() < 0.3, rng=rng)
+        if rng.random() < 0.1:
+            raw = b"\r\n" + raw
+        requests.append((raw, text))
+    return b"".join(raw for raw, _ in requests), requests
+
+
+def split(stream, sizes):
+    pos = 0
+    while pos < len(stream):
+        size = next(sizes)
+        yield stream[pos:pos + size]
+        pos += size
+
+
+def old_receiver_recovered(requests):
+    """Messages the one-recv-per-request receiver got right when every request is sent on its own."""
+    recovered = 0
+    with contextlib.redirect_stdout(io.StringIO()):  # its parse errors
+        for raw, text in requests:
+            message = NetworkSMSReceiver.extract_sms_data(raw[:OLD_BUFFER_SIZE])
+            recovered += message is not None and message["message"] == text
+    return recovered
+
+
+def parse(pieces):
+    parser = HttpRequestParser()
+    requests = []
+    for piece in pieces:
+        requests.extend(parser.feed(piece))
+    return [json.loads(request.body)["message"] for request in requests], parser.pending
+
+
+def over_tcp(stream, expected, rng):
+    """(messages delivered, 200 responses, seconds) when the stream is sent to a receiver in random pieces."""
+    received = []
+    responses = []
+
+    def on_sms(message):
+        received.append(message["message"])
+
+    receiver, address = start_receiver(on_sms, rate_limit=None)
+    start = time.perf_counter()
+    with socket.create_connection(address) as client:
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        reader = threading.Thread(target=lambda: responses.extend(read_responses(client, expected)))
+        reader.start()
+        for piece in split(stream, iter(lambda: rng.randint(1, 4096), None)):
+            client.sendall(piece)
+        reader.join(timeout=30)
+    elapsed = time.perf_counter() - start
+    receiver.stop_server()
+    return received, sum(status == 200 for status, _, _ in responses), elapsed
+
+
+def unframed(failures):
+    """A POST without Content-Length: accepted if the connection closes after it, 411 on keep-alive."""
+    received = []
+    receiver, address = start_receiver(lambda message: received.append(message["message"]), rate_limit=None)
+    body = json.dumps({"message": "unframed", "sender": "+905550000000"}).encode()
+    statuses = []
+    for connection in (b"Connection: close\r\n", b""):
+        with socket.create_connection(address) as client:
+            client.sendall(b"POST /sms HTTP/1.1\r\n" + connection + b"\r\n" + body)
+            statuses.extend(status for status, _, _ in read_responses(client, 1))
+    receiver.stop_server()
+    print(f"no Content-Length: Connection: close -> {statuses[0]}, keep-alive -> {statuses[1]}")
+    if statuses != [200, 411] or received != ["unframed"]:
+        failures.append(f"unframed requests: statuses {statuses}, delivered {received}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+    stream, requests = build_stream(count, rng)
+    expected = [text for _, text in requests]
+    failures = []
+
+    print(f"requests: {count}, stream: {len(stream) / 1024:.0f} KB, "
+          f"over {OLD_BUFFER_SIZE} bytes: {sum(len(raw) > OLD_BUFFER_SIZE for raw, _ in requests)}")
+    print(f"old receiver, one recv({OLD_BUFFER_SIZE}) per request: "
+          f"{old_receiver_recovered(requests)}/{count} recovered\n")
+
+    feeds = {
+        "1 byte": lambda: iter(lambda: 1, None),
+        "random 1-4096": lambda: iter(lambda: rng.randint(1, 4096), None),
+        "16 KB": lambda: iter(lambda: 16384, None),
+        "whole stream": lambda: iter(lambda: len(stream), None),
+    }
+    print(f"{'reads':>14} {'recovered':>10} {'MB/s':>8} {'us/request':>11}")
+    for name, sizes in feeds.items():
+        pieces = [memoryview(piece) for piece in split(stream, sizes())]
+        start = time.perf_counter()
+        got, pending = parse(pieces)
+        elapsed = time.perf_counter() - start
+        ok = sum(a == b for a, b in zip(got, expected)) if len(got) == count else 0
+        print(f"{name:>14} {ok:>6}/{count} {len(stream) / elapsed / 1e6:>8.1f} {elapsed * 1e6 / count:>11.1f}")
+        if ok != count or pending:
+            failures.append(f"{name}: {ok}/{count} recovered, {pending} bytes left over")
+
+    received, accepted, elapsed = over_tcp(stream, count, rng)
+    ok = sum(a == b for a, b in zip(received, expected)) if len(received) == count else 0
+    print(f"\nloopback TCP: {ok}/{count} delivered, {accepted} answered 200, in {elapsed * 1000:.0f} ms")
+    if ok != count or accepted != count:
+        failures.append(f"loopback TCP: {ok}/{count} delivered, {accepted} answered 200")
+    unframed(failures)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: every message recovered intact")
+
+
+if __name__ == '__main__':
+    main()
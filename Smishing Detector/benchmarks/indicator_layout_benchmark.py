@@ -0,0 +1,64 @@
+"""
+Tagged vs indicator feature layout: preprocessing and vectorization work per message.
+
+The tagged layout writes " <ALERT_WORD> " and <URL>/<PHONE>/... placeholders
+into the text, so they are lemmatized, n-grammed and looked up like words.
+The indicator layout returns them as ids for a separate sparse block. For
+every message of model/sms_data_corrected.csv this reports, per layout:
+
+- characters handed to the lemmatizer and tokens / n-gram terms per message;
+- time to clean (normalize + lemmatize) and to vectorize the terms.
+
+Vectorization uses the shipped vocabulary for both layouts, so it measures
+the work, not a trained indicator model. Run from the 'Smishing Detector'
+folder:
+
+    python benchmarks/indicator_layout_benchmark.py
+"""
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.model_bundle import load_bundle
+from components.preprocess import (
+    clean_token_lists, indicator_token_lists, normalize_text, normalize_text_indicators, warm_up
+)
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+BUNDLE_PATH = 'model/sms_model.bundle'
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        messages = [row['TEXT'] for row in csv.DictReader(f)]
+    fused = load_bundle(BUNDLE_PATH).fused_scorer
+    warm_up()
+    n = len(messages)
+
+    tagged_chars = sum(len(normalize_text(message)) for message in messages)
+    indicator_chars = sum(len(normalize_text_indicators(message)[0]) for message in messages)
+    tagged, tagged_clean = timed(lambda: list(clean_token_lists(messages)))
+    pairs, indicator_clean = timed(lambda: list(indicator_token_lists(messages)))
+    plain = [tokens for tokens, _ in pairs]
+    indicators = [ids for _, ids in pairs]
+
+    rows = (("tagged", tagged_chars, tagged, tagged_clean), ("indicators", indicator_chars, plain, indicator_clean))
+    print(f"messages: {n}, indicators per message: {sum(map(len, indicators)) / n:.2f}")
+    print(f"{'layout':>10} {'chars':>6} {'tokens':>7} {'terms':>6} {'clean us':>9} {'vectorize us':>13}")
+    for layout, chars, token_lists, clean_time in rows:
+        terms = sum(len(fused.ngrams_from_tokens(tokens)) for tokens in token_lists)
+        _, vectorize_time = timed(lambda: [fused.vectorize_tokens(tokens) for tokens in token_lists])
+        print(f"{layout:>10} {chars / n:>6.1f} {sum(map(len, token_lists)) / n:>7.1f} {terms / n:>6.1f} "
+              f"{clean_time * 1e6 / n:>9.1f} {vectorize_time * 1e6 / n:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
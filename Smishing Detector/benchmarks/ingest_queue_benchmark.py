@@ -0,0 +1,155 @@
+"""
+Ingest queue: phones sending faster than SMS can be classified.
+
+Several phones pipeline SMS at a NetworkSMSReceiver on loopback while one
+consumer takes them from an IngestQueue at a fixed, slower rate (a stand-in
+for the classifier). For each overflow policy, and for an unbounded queue,
+this reports the phones' 200/503 counts, the queue's peak depth and its
+accepted/rejected/dropped counters, and how long stop_server took to drain
+what was still queued. It checks that the peak never exceeds the capacity,
+that every 200 was counted as accepted and every 503 as rejected, and that
+the queue is empty once stop_server returns.
+
+It then runs an InferencePool under drop_oldest and checks that every job
+still reaches result_fn or error_fn (JobDropped) in submission order.
+Exits with status 1 if a check fails. Run from the 'Smishing Detector'
+folder:
+
+    python benchmarks/ingest_queue_benchmark.py [messages per phone]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.loopback import read_responses, sms_request, start_receiver
+from components.inference_pool import InferencePool, JobDropped
+from components.ingest_queue import BLOCK, DROP_OLDEST, REJECT, IngestQueue, QueueFull
+from components.network_sms_receiver import RequestRejected
+
+PHONES = 4
+CAPACITY = 200
+CONSUME_SECONDS = 0.0005  # per SMS: about 2000 SMS/s, slower than the phones send
+SMS = sms_request(json.dumps({"message": "Your parcel is held, pay the fee at hxxp://x.co", "sender": "CARGO"}).encode())
+
+
+def consume(queue, taken):
+    while True:
+        batch = queue.get_batch(32)
+        if not batch:
+            return
+        time.sleep(CONSUME_SECONDS * len(batch))
+        taken[0] += len(batch)
+
+
+def phone(address, count, statuses):
+    with socket.create_connection(address) as sock:
+        reader = threading.Thread(target=lambda: statuses.extend(s for s, _, _ in read_responses(sock, count)))
+        reader.start()
+        sock.sendall(SMS * count)
+        reader.join()
+
+
+def flood(policy, capacity, count, failures):
+    queue = IngestQueue(capacity, policy, block_timeout=0.05)
+    taken = [0]
+    consumer = threading.Thread(target=consume, args=(queue, taken))
+    consumer.start()
+
+    def on_sms(message):
+        try:
+            queue.put(message)
+        except QueueFull as e:
+            raise RequestRejected(503, str(e), retry_after=1)
+
+    receiver, address = start_receiver(on_sms, rate_limit=None, ingest_queue=queue)
+    statuses = []
+    start = time.perf_counter()
+    phones = [threading.Thread(target=phone, args=(address, count, statuses)) for _ in range(PHONES)]
+    for thread in phones:
+        thread.start()
+    for thread in phones:
+        thread.join()
+    sent_time = time.perf_counter() - start
+    depth_at_stop = len(queue)
+
+    start = time.perf_counter()
+    receiver.stop_server()
+    drain_time = time.perf_counter() - start
+    stats = queue.stats()
+    queue.close()
+    consumer.join()
+
+    name = policy if capacity else "unbounded"
+    ok, refused = statuses.count(200), statuses.count(503)
+    print(f"{name:>12} {ok:>6} {refused:>6} {stats.high_water:>6} {stats.accepted:>9} {stats.rejected:>9} "
+          f"{stats.dropped:>8} {sent_time * 1000:>8.0f} {depth_at_stop:>6} {drain_time * 1000:>9.0f}")
+    if len(statuses) != PHONES * count:
+        failures.append(f"{name}: {len(statuses)} responses for {PHONES * count} SMS")
+    if capacity and stats.high_water > capacity:
+        failures.append(f"{name}: queue reached {stats.high_water} > capacity {capacity}")
+    if ok != stats.accepted or refused != stats.rejected:
+        failures.append(f"{name}: statuses do not match the queue counters")
+    if stats.depth:
+        failures.append(f"{name}: {stats.depth} SMS still queued after stop_server")
+    if taken[0] != stats.accepted - stats.dropped:
+        failures.append(f"{name}: consumer took {taken[0]}, expected {stats.accepted - stats.dropped}")
+
+
+class TimerRoot:
+    """Stands in for Tk: runs root.after callbacks on timer threads."""
+
+    def after(self, delay, fn, *args):
+        timer = threading.Timer(delay / 1000, fn, args)
+        timer.daemon = True
+        timer.start()
+
+
+def check_pool_order(failures):
+    delivered = []
+
+    def work(jobs):
+        time.sleep(CONSUME_SECONDS * len(jobs))
+        return jobs
+
+    pool = InferencePool(TimerRoot(), work, lambda job, result: delivered.append((job, "result")),
+                         lambda job, error: delivered.append((job, type(error).__name__)),
+                         workers=2, capacity=50, policy=DROP_OLDEST).start()
+    total = 2000
+    for start in range(0, total, 20):
+        pool.submit_many(range(start, start + 20))
+    pool.shutdown(wait=True)
+    deadline = time.monotonic() + 5
+    while len(delivered) < total and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dropped = sum(1 for _, kind in delivered if kind == JobDropped.__name__)
+    print(f"\nInferencePool, drop_oldest, capacity 50: {total} jobs, {total - dropped} classified, "
+          f"{dropped} dropped, stats {pool.ingest_queue.stats()}")
+    if [job for job, _ in delivered] != list(range(total)):
+        failures.append("InferencePool: jobs not delivered once each, in submission order")
+    if dropped != pool.ingest_queue.stats().dropped:
+        failures.append("InferencePool: JobDropped count differs from the queue's dropped count")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    failures = []
+    print(f"{PHONES} phones x {count} pipelined SMS, consumer ~{1 / CONSUME_SECONDS:.0f} SMS/s, capacity {CAPACITY}")
+    print(f"{'policy':>12} {'200':>6} {'503':>6} {'peak':>6} {'accepted':>9} {'rejected':>9} "
+          f"{'dropped':>8} {'send ms':>8} {'left':>6} {'drain ms':>9}")
+    for policy, capacity in ((REJECT, CAPACITY), (BLOCK, CAPACITY), (DROP_OLDEST, CAPACITY), (REJECT, None)):
+        flood(policy, capacity, count, failures)
+    check_pool_order(failures)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("\nOK: queue stayed within capacity and was drained at stop")
+
+
+if __name__ == '__main__':
+    main()
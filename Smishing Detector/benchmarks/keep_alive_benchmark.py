@@ -0,0 +1,141 @@
+"""
+Responses and keep-alive: what a phone gets back, and what reconnecting costs.
+
+Against a NetworkSMSReceiver on loopback, this first checks the response
+to each kind of request (accepted SMS, bad JSON, GET, oversized body,
+rate limit, rejected by the callback) and whether the connection
+survives it. It then sends the same SMS three ways and reports SMS/s and
+the median time per SMS:
+
+- a new connection per SMS (Connection: close), as clients did when no
+  response ever came back;
+- one keep-alive connection, waiting for each response;
+- one connection with every request pipelined and responses read after.
+
+Exits with status 1 if a response is wrong. Run from the 'Smishing
+Detector' folder:
+
+    python benchmarks/keep_alive_benchmark.py [messages]
+"""
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.loopback import read_responses, sms_request, start_receiver
+from components.network_sms_receiver import RequestRejected
+
+SMS = json.dumps({"message": "Your card is blocked, call 0850 000 00 00", "sender": "BANK"}).encode()
+
+
+def exchange(address, raw, count=1):
+    """Send raw on a new connection; returns (responses, whether the server then closed it)."""
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(raw)
+        responses = read_responses(sock, count)
+        sock.settimeout(0.2)
+        try:
+            closed = sock.recv(1) == b""
+        except socket.timeout:
+            closed = False
+    return responses, closed
+
+
+def exchange_once(address):
+    with socket.create_connection(address) as sock:
+        sock.sendall(sms_request(SMS, keep_alive=False))
+        read_responses(sock, 1)
+
+
+def check_statuses(failures):
+    def on_sms(message):
+        if message["message"] == "reject me":
+            raise RequestRejected(503, "model not loaded", retry_after=30)
+        return 7
+
+    receiver, address = start_receiver(on_sms, rate_limit=1, rate_burst=3)
+    cases = (
+        ("SMS", sms_request(SMS), 1, [200], False),
+        ("bad JSON, then SMS", sms_request(b"{not json") + sms_request(SMS), 2, [400, 200], False),
+        ("GET", b"GET / HTTP/1.1\r\n\r\n", 1, [405], False),
+        ("Connection: close", sms_request(SMS, keep_alive=False), 1, [200], True),
+        ("oversized body", b"POST / HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n", 1, [413], True),
+        ("broken framing", b"POST / HTTP/1.1\r\nContent-Length: x\r\n\r\n", 1, [400], True),
+        ("burst over the limit", sms_request(SMS) * 4, 4, [200, 200, 200, 429], False),
+        ("rejected by callback", sms_request(json.dumps({"message": "reject me"}).encode()), 1, [503], False),
+    )
+    print(f"{'request':>22} {'statuses':>22} {'closed':>7}")
+    for name, raw, count, expected, expect_closed in cases:
+        responses, closed = exchange(address, raw, count)
+        statuses = [status for status, _, _ in responses]
+        print(f"{name:>22} {str(statuses):>22} {str(closed):>7}")
+        if statuses != expected or closed != expect_closed:
+            failures.append(f"{name}: got {statuses}, closed={closed}; expected {expected}, closed={expect_closed}")
+    receiver.stop_server()
+
+
+def timed_modes(count):
+    receiver, address = start_receiver(lambda message: None, rate_limit=None)
+    results = {}
+
+    def new_connection_each():
+        times = []
+        for _ in range(count):
+            start = time.perf_counter()
+            exchange_once(address)
+            times.append(time.perf_counter() - start)
+        return times
+
+    def keep_alive():
+        times = []
+        with socket.create_connection(address) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            request = sms_request(SMS)
+            for _ in range(count):
+                start = time.perf_counter()
+                sock.sendall(request)
+                read_responses(sock, 1)
+                times.append(time.perf_counter() - start)
+        return times
+
+    def pipelined():
+        with socket.create_connection(address) as sock:
+            start = time.perf_counter()
+            reader = threading.Thread(target=lambda: read_responses(sock, count))
+            reader.start()
+            sock.sendall(sms_request(SMS) * count)
+            reader.join()
+            return [(time.perf_counter() - start) / count] * count
+
+    for name, mode in (("connection per SMS", new_connection_each), ("keep-alive", keep_alive),
+                       ("pipelined", pipelined)):
+        start = time.perf_counter()
+        times = mode()
+        results[name] = (count / (time.perf_counter() - start), statistics.median(times))
+    receiver.stop_server()
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    failures = []
+    check_statuses(failures)
+
+    print(f"\n{count} SMS, one sender")
+    print(f"{'mode':>20} {'SMS/s':>8} {'median us':>10}")
+    for name, (rate, median) in timed_modes(count).items():
+        print(f"{name:>20} {rate:>8.0f} {median * 1e6:>10.1f}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("\nOK: every request answered as expected")
+
+
+if __name__ == '__main__':
+    main()
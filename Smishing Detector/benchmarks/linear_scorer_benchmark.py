@@ -0,0 +1,70 @@
+"""
+Kernel SVC predict vs. the primal LinearSVCScorer.
+
+Rebuilds the test split exactly like model/model.py, checks that both models
+return identical labels on it, and reports per-message latency and the
+memory held by each model. Run from the 'Smishing Detector' folder:
+
+    python benchmarks/linear_scorer_benchmark.py
+"""
+import os
+import sys
+import time
+
+import joblib
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.linear_model import LinearSVCScorer
+from components.preprocess import clean_texts
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+MODEL_PATH = 'model/sms_model.joblib'
+VECTORIZER_PATH = 'model/tfidf_vectorizer.joblib'
+
+
+def svc_nbytes(svc):
+    total = svc.intercept_.nbytes
+    for matrix in (svc.support_vectors_, svc.dual_coef_):
+        if hasattr(matrix, "indptr"):
+            total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        else:
+            total += matrix.nbytes
+    return total
+
+
+def per_message_us(model, X, rows=500):
+    rows = min(rows, X.shape[0])
+    start = time.perf_counter()
+    for i in range(rows):
+        model.predict(X[i])
+    return (time.perf_counter() - start) * 1e6 / rows
+
+
+def main():
+    svc = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    scorer = LinearSVCScorer.from_svc(svc)
+
+    df = pd.read_csv(DATA_PATH)
+    df['TEXT'] = list(clean_texts(df['TEXT']))
+    df = df[df['TEXT'].str.len() > 0]
+    df = df[df['LABEL'].isin(['ham', 'spam', 'smishing'])]
+    y = LabelEncoder().fit_transform(df['LABEL'])
+    _, X_test, _, _ = train_test_split(df['TEXT'], y, test_size=0.15, random_state=42, stratify=y)
+    X = vectorizer.transform(X_test)
+
+    mismatches = int((svc.predict(X) != scorer.predict(X)).sum())
+    print(f"test split: {X.shape[0]} messages, {mismatches} label mismatches")
+    print(f"support vectors: {svc.support_vectors_.shape[0]}, one-vs-one pairs: {len(scorer.pairs)}")
+    svc_us, scorer_us = per_message_us(svc, X), per_message_us(scorer, X)
+    print(f"SVC predict:    {svc_us:8.1f} us/msg")
+    print(f"scorer predict: {scorer_us:8.1f} us/msg  ({svc_us / scorer_us:.0f}x)")
+    print(f"model memory:   {svc_nbytes(svc) / 1024:.0f} KB -> {scorer.nbytes / 1024:.0f} KB")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
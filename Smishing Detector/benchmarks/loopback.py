@@ -0,0 +1,60 @@
+"""
+Helpers for the benchmarks that talk to a real NetworkSMSReceiver over loopback TCP.
+
+Not a benchmark itself: start_receiver runs the server without Tk (root.after
+callbacks run immediately on the calling thread) and read_responses parses
+the receiver's replies on a client socket.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.network_sms_receiver import NetworkSMSReceiver
+
+
+class ImmediateRoot:
+    """Stands in for Tk: runs root.after callbacks on the calling thread."""
+
+    def after(self, delay, fn, *args):
+        fn(*args)
+
+
+def start_receiver(sms_callback, **options):
+    """A running NetworkSMSReceiver on a free port; returns (receiver, (host, port))."""
+    receiver = NetworkSMSReceiver(ImmediateRoot(), sms_callback, lambda *args: None,
+                                  callback_on_ui_thread=False, **options)
+    receiver._show_qr_popup = lambda payload: None
+    receiver.start_server(port=0)
+    while receiver.server_socket is None or receiver.server_socket.getsockname()[1] == 0:
+        time.sleep(0.01)
+    return receiver, ("127.0.0.1", receiver.server_socket.getsockname()[1])
+
+
+def sms_request(body, keep_alive=True):
+    """A POST request carrying body (bytes), framed with Content-Length."""
+    connection = b"" if keep_alive else b"Connection: close\r\n"
+    return b"POST /sms HTTP/1.1\r\n%sContent-Length: %d\r\n\r\n%s" % (connection, len(body), body)
+
+
+def read_responses(sock, count):
+    """The next `count` responses on sock as (status, headers, body); fewer if the server closes."""
+    responses = []
+    data = bytearray()
+    while len(responses) < count:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        while True:
+            end = data.find(b"\r\n\r\n")
+            if end == -1:
+                break
+            lines = data[:end].decode("latin-1").split("\r\n")
+            headers = dict(line.lower().split(": ", 1) for line in lines[1:])
+            length = int(headers["content-length"])
+            if len(data) < end + 4 + length:
+                break
+            responses.append((int(lines[0].split(" ")[1]), headers, bytes(data[end + 4:end + 4 + length])))
+            del data[:end + 4 + length]
+    return responses
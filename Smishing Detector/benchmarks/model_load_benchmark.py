@@ -0,0 +1,80 @@
+"""
+Startup cost of the model: joblib pickles vs the memory-mapped bundle.
+
+For each format, in fresh interpreter processes (so nothing is already
+imported or cached in Python), measures:
+
+- load: joblib.load of sms_model.joblib + tfidf_vectorizer.joblib and the
+  conversion to LinearSVCScorer/FusedTfidfScorer, or load_bundle();
+- first prediction: the first fused vectorize+score after loading (for the
+  bundle this is the first touch of the mapped vocabulary table);
+- import: the libraries each path has to import first (sklearn for joblib).
+
+Export the bundle first with model/export_bundle.py. Run from the
+'Smishing Detector' folder:
+
+    python benchmarks/model_load_benchmark.py [repeats]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLE_PATH = 'model/sms_model.bundle'
+SAMPLE_TEXT = "urgent account lock verify <URL> call <PHONE>"
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, '.')
+start = time.perf_counter()
+if sys.argv[1] == 'joblib':
+    import joblib
+    from components.fused_scorer import build_fused_scorer
+    from components.linear_model import to_linear_scorer
+    imported = time.perf_counter()
+    model = to_linear_scorer(joblib.load('model/sms_model.joblib'))
+    scorer = build_fused_scorer(joblib.load('model/tfidf_vectorizer.joblib'), model)
+else:
+    from components.model_bundle import load_bundle
+    imported = time.perf_counter()
+    scorer = load_bundle(sys.argv[2]).fused_scorer
+loaded = time.perf_counter()
+scorer.predict(sys.argv[3])
+predicted = time.perf_counter()
+print(json.dumps({"import": imported - start, "load": loaded - imported, "first": predicted - loaded}))
+"""
+
+
+def run(kind, repeats):
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, kind, BUNDLE_PATH, SAMPLE_TEXT],
+            cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) * 1000 for key in samples[0]}
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if not os.path.exists(os.path.join(APP_DIR, BUNDLE_PATH)):
+        sys.exit(f"{BUNDLE_PATH} not found; run model/export_bundle.py first.")
+    sizes = {
+        "joblib": sum(os.path.getsize(os.path.join(APP_DIR, p))
+                      for p in ('model/sms_model.joblib', 'model/tfidf_vectorizer.joblib')),
+        "bundle": os.path.getsize(os.path.join(APP_DIR, BUNDLE_PATH)),
+    }
+
+    print(f"median of {repeats} fresh processes, ms")
+    print(f"{'format':>7} {'size KB':>8} {'import':>8} {'load':>8} {'1st pred':>9} {'total':>8}")
+    for kind in ("joblib", "bundle"):
+        t = run(kind, repeats)
+        total = t["import"] + t["load"] + t["first"]
+        print(f"{kind:>7} {sizes[kind] / 1024:>8.0f} {t['import']:>8.1f} {t['load']:>8.2f} {t['first']:>9.2f} {total:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Simultaneous phones: delivery and throughput of NetworkSMSReceiver.
+
+For 1, 10 and 100 senders, every sender opens one persistent loopback
+connection; once all of them are connected they send their SMS requests at
+the same time. The old accept loop served one connection until it closed,
+so every other phone waited (or timed out) in the listen queue. This
+reports, per sender count:
+
+- connections the receiver held open at once (should equal the senders);
+- SMS delivered to the callback and throughput;
+- the slowest sender's time from its first request to its last response;
+- how long stop_server takes with every connection still open.
+
+Exits with status 1 if a message is lost. Run from the 'Smishing Detector'
+folder:
+
+    python benchmarks/multi_client_benchmark.py [messages_per_sender]
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.loopback import read_responses, sms_request, start_receiver
+
+SENDER_COUNTS = (1, 10, 100)
+TIMEOUT = 60
+
+
+def parcel_sms(sender, i):
+    return sms_request(json.dumps({
+        "message": f"Your parcel {i} is held, pay the fee at http://parcel-{sender}.example.tk",
+        "sender": f"+90555{sender:07d}",
+        "timestamp": 1700000000000,
+    }).encode())
+
+
+def run(senders, per_sender):
+    received = []
+    lock = threading.Lock()
+    done = threading.Event()
+    expected = senders * per_sender
+
+    def on_sms(message):
+        with lock:
+            received.append(message["sender"])
+            if len(received) == expected:
+                done.set()
+
+    receiver, address = start_receiver(on_sms, rate_limit=None)
+    connected = threading.Barrier(senders + 1)
+    send_times = []
+    answered = []
+
+    def sender(n):
+        with socket.create_connection(address, timeout=TIMEOUT) as sock:
+            connected.wait()
+            start = time.perf_counter()
+            # One request per send, as phones do; responses are read as they come
+            reader = threading.Thread(target=lambda: answered.append(read_responses(sock, per_sender)))
+            reader.start()
+            for i in range(per_sender):
+                sock.sendall(parcel_sms(n, i))
+            reader.join(TIMEOUT)
+            with lock:
+                send_times.append(time.perf_counter() - start)
+            done.wait(TIMEOUT)
+
+    threads = [threading.Thread(target=sender, args=(n,)) for n in range(senders)]
+    for thread in threads:
+        thread.start()
+    connected.wait(TIMEOUT)
+    start = time.perf_counter()
+    while receiver.client_count < senders and time.perf_counter() - start < TIMEOUT:
+        time.sleep(0.001)
+    concurrent = receiver.client_count
+    done.wait(TIMEOUT)
+    elapsed = time.perf_counter() - start
+
+    stop_start = time.perf_counter()
+    receiver.stop_server()
+    stop_time = time.perf_counter() - stop_start
+    for thread in threads:
+        thread.join()
+
+    complete = sorted(received) == sorted(f"+90555{n:07d}" for n in range(senders) for _ in range(per_sender))
+    complete = complete and sum(status == 200 for responses in answered for status, _, _ in responses) == expected
+    return concurrent, len(received), complete, elapsed, max(send_times), stop_time
+
+
+def main():
+    per_sender = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    failures = []
+    print(f"{per_sender} SMS per sender")
+    print(f"{'senders':>8} {'open':>5} {'delivered':>11} {'SMS/s':>8} {'slowest ms':>11} {'stop ms':>8}")
+    for senders in SENDER_COUNTS:
+        concurrent, delivered, complete, elapsed, slowest, stop_time = run(senders, per_sender)
+        print(f"{senders:>8} {concurrent:>5} {delivered:>11} {delivered / elapsed:>8.0f} "
+              f"{slowest * 1000:>11.1f} {stop_time * 1000:>8.1f}")
+        if not complete:
+            failures.append(f"{senders} senders: {delivered}/{senders * per_sender} delivered or not all answered 200")
+        if concurrent != senders:
+            failures.append(f"{senders} senders: only {concurrent} connections open at once")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: every phone served at once, every SMS delivered")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Parity check and timing for components.preprocess.normalize_text.
+
+Runs the original step-by-step normalization (frozen below) and the fused
+normalize_text over model/sms_data_corrected.csv plus a random fuzz corpus,
+and fails if a single message differs. Run from the 'Smishing Detector' folder:
+
+    python benchmarks/preprocess_parity.py
+"""
+import csv
+import os
+import random
+import re
+import string
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.preprocess import SUSPICIOUS_KEYWORDS, normalize_text
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+
+
+def reference_normalize(text):
+    """The original clean_text, up to (not including) spaCy."""
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    try:
+        text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('utf-8')
+    except:
+        pass
+    text = re.sub(r'[^a-zA-Z0-9\s<>$£₺]+', ' ', text)
+    text = re.sub(r'<.*?>', ' ', text)
+    text = re.sub(r'(\s\s+)', ' ', text).strip()
+    text = re.sub(r'([!?])\1+', r'\1', text)
+    text = re.sub(r'(.)\1{2,}', r'\1\1', text)
+    for word in SUSPICIOUS_KEYWORDS:
+        if word in text:
+            text += f" <ALERT_{word.upper()}> "
+    text = re.sub(r'http\S+|www\S+', ' <URL> ', text)
+    text = re.sub(r'\S+@\S+', ' <EMAIL> ', text)
+    text = re.sub(r'(\+?\d[\d\s\-\(\)]{4,}\d)', ' <PHONE> ', text)
+    text = re.sub(r'\b[a-z0-9.-]+\.[a-z]{2,}\b', ' <DOMAIN> ', text)
+    text = re.sub(r'\d+\s*(usd|eur|\$|£|tl|₺)', ' <MONEY> ', text)
+    text = re.sub(r'\d+', ' <NUM> ', text)
+    text = text.translate(str.maketrans('', '', string.punctuation.replace("'", "")))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def load_corpus(path=DATA_PATH):
+    with open(path, encoding='utf-8', errors='replace', newline='') as f:
+        return [row['TEXT'] for row in csv.DictReader(f)]
+
+
+def fuzz_corpus(count=20000, seed=42):
+    """Random messages built from the characters and fragments the patterns care about."""
+    rnd = random.Random(seed)
+    fragments = [
+        'http://bit.ly/x', 'www.win.com', 'a@b.co', '+44 (0)20-7946', '100usd', '5 eur', '$20',
+        '£50', '₺30', '10 tl', '<b>', '</a>', '<', '>', '!!!', '???', 'cooool', 'ÇAĞRI', 'naïve',
+        '\n', '\t', '  ', 'click here', 'act now', 'pinstall', 'Account Number', '07700 900123',
+    ] + list(SUSPICIOUS_KEYWORDS)
+    alphabet = string.ascii_letters + string.digits + string.punctuation + ' \n\téü£₺’'
+    corpus = []
+    for _ in range(count):
+        parts = [rnd.choice(fragments) if rnd.random() < 0.4 else
+                 ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 8)))
+                 for _ in range(rnd.randint(0, 12))]
+        corpus.append(''.join(rnd.choice(['', ' ']) + p for p in parts))
+    return corpus
+
+
+def check_parity(corpus):
+    mismatches = [text for text in corpus if normalize_text(text) != reference_normalize(text)]
+    for text in mismatches[:5]:
+        print(f"  MISMATCH: {text!r}\n    expected: {reference_normalize(text)!r}\n    got:      {normalize_text(text)!r}")
+    return len(mismatches)
+
+
+def time_it(func, corpus, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    corpus = load_corpus()
+    fuzz = fuzz_corpus()
+    failed = 0
+    for name, texts in (('dataset', corpus), ('fuzz', fuzz)):
+        bad = check_parity(texts)
+        failed += bad
+        print(f"{name}: {len(texts)} messages, {bad} mismatches")
+
+    old = time_it(reference_normalize, corpus)
+    new = time_it(normalize_text, corpus)
+    print(f"reference: {old * 1e6 / len(corpus):.1f} us/msg")
+    print(f"fused:     {new * 1e6 / len(corpus):.1f} us/msg  ({old / new:.2f}x)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+ProcessClassifier: startup time, per-batch IPC overhead and scaling over cores.
+
+- startup: time until every worker process has loaded the model, vectorizer
+  and language tools, for each process count;
+- IPC: round trip of one batch to a worker that does no work, i.e. the
+  pickling/pipe cost a real batch pays on top of classification;
+- scaling: messages per second on model/sms_data_corrected.csv for 1..N
+  processes, next to in-process classify_batch.
+
+Run from the 'Smishing Detector' folder:
+
+    python benchmarks/process_pool_benchmark.py [max_processes]
+"""
+import csv
+import os
+import sys
+import time
+
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.classifier import classify_batch
+from components.linear_model import to_linear_scorer
+from components.preprocess import warm_up
+from components.process_engine import ProcessClassifier
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+MODEL_PATH = 'model/sms_model.joblib'
+VECTORIZER_PATH = 'model/tfidf_vectorizer.joblib'
+LABELS = ['ham', 'smishing', 'spam']
+CHUNK_SIZE = 64
+IPC_REPEATS = 200
+
+
+def _echo(messages):
+    # same payload shape back as _classify_chunk, without the work
+    return messages, [0] * len(messages)
+
+
+def process_counts(max_processes):
+    counts, n = [], 1
+    while n < max_processes:
+        counts.append(n)
+        n *= 2
+    return counts + [max_processes]
+
+
+def ipc_overhead(engine, messages, batch_size):
+    batch = messages[:batch_size]
+    start = time.perf_counter()
+    for _ in range(IPC_REPEATS):
+        engine._pool.apply(_echo, (batch,))
+    return (time.perf_counter() - start) / IPC_REPEATS * 1000
+
+
+def main():
+    max_processes = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        messages = [row['TEXT'] for row in csv.DictReader(f)]
+
+    model = to_linear_scorer(joblib.load(MODEL_PATH))
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    warm_up()
+    start = time.perf_counter()
+    classify_batch(messages, model, vectorizer, LABELS)
+    baseline = len(messages) / (time.perf_counter() - start)
+    print(f"{len(messages)} messages, in-process classify_batch: {baseline:8.0f} msg/s\n")
+
+    print(f"{'processes':>9} {'startup':>9} {'msg/s':>9} {'speedup':>8}")
+    for n in process_counts(max_processes):
+        start = time.perf_counter()
+        engine = ProcessClassifier(MODEL_PATH, VECTORIZER_PATH, LABELS, processes=n, chunk_size=CHUNK_SIZE).start()
+        startup = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            engine.classify(messages)
+            rate = len(messages) / (time.perf_counter() - start)
+            print(f"{n:>9} {startup:>8.2f}s {rate:>9.0f} {rate / baseline:>7.2f}x")
+            if n == 1:
+                ipc_engine = engine
+                engine = None
+        finally:
+            if engine is not None:
+                engine.close()
+
+    print("\nper-batch IPC round trip (no work done in the worker)")
+    try:
+        for batch_size in (1, 16, CHUNK_SIZE, 256):
+            print(f"  batch {batch_size:>4}: {ipc_overhead(ipc_engine, messages, batch_size):7.3f} ms")
+    finally:
+        ipc_engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Worst-case regex time per message: crafted and random inputs.
+
+Every message from the network goes through normalize_text (or
+normalize_text_indicators) and scan_entities before it is lemmatized. This
+script feeds them inputs built to make backtracking patterns retry from
+every position ("<<<<...", "a.a.a...a1", long word runs before an '@',
+digit runs with separators, ...) plus random strings over the characters
+the patterns care about, and reports:
+
+- the slowest input at MAX_MESSAGE_LENGTH characters, against a budget;
+- how time grows from 1x to 4x and 16x that length (linear patterns grow
+  about 4x per step, quadratic ones 16x);
+- that strip_tags still removes exactly what re.sub(r'<[^>\\n]*>') did;
+- that truncate_message keeps a huge message within the limit.
+
+Exits with status 1 if any check fails. Run from the 'Smishing Detector'
+folder:
+
+    python benchmarks/redos_benchmark.py [budget_ms] [fuzz_samples]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.feature_extraction import scan_entities
+from components.preprocess import (
+    MAX_MESSAGE_LENGTH, normalize_text, normalize_text_indicators, strip_tags, truncate_message
+)
+
+SCALES = (1, 4, 16)
+# Allowed growth per 4x longer input; quadratic patterns show ~16x
+MAX_GROWTH = 8
+FUZZ_ALPHABET = "<>\n.-@ 1a$+()wh:/"
+TAG_RE = re.compile(r'<[^>\n]*>')
+
+# Each builds an input of exactly n characters
+ADVERSARIAL = {
+    "unclosed tags": lambda n: "<" * n,
+    "tags before newline": lambda n: ("<a" * n)[:n - 2] + "\n>",
+    "dotted chain": lambda n: ("a." * n)[:n - 1] + "1",
+    "hyphen labels": lambda n: ("a.-" * n)[:n - 1] + "1",
+    "word before @": lambda n: "a" * (n - 6) + " @x.co",
+    "dots before @": lambda n: "." * (n - 1) + "@",
+    "phone separators": lambda n: "1" + " " * (n - 2) + "x",
+    "spaced digits": lambda n: ("1 " * n)[:n - 3] + "x@.",
+    "digit run": lambda n: "1" * (n - 1) + " ",
+    "www chain": lambda n: ("www." * n)[:n],
+    "no repeats": lambda n: ("ab" * n)[:n],
+    "keywords": lambda n: ("account " * n)[:n],
+    "mixed": lambda n: ("1.a-" * n)[:n - 1] + "@",
+}
+
+STAGES = {
+    "normalize_text": normalize_text,
+    "normalize_text_indicators": normalize_text_indicators,
+    "scan_entities": scan_entities,
+}
+
+
+def worst_time(text, repeats=3):
+    """Slowest stage on text, in seconds (best of `repeats` runs per stage)."""
+    worst = 0.0
+    for stage in STAGES.values():
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stage(text)
+            best = min(best, time.perf_counter() - start)
+        worst = max(worst, best)
+    return worst
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    fuzz_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    length = MAX_MESSAGE_LENGTH
+    rng = random.Random(0)
+    failures = []
+
+    print(f"slowest stage per input, ms (max_message_length = {length})")
+    print(f"{'input':>22} " + " ".join(f"{f'{scale}x':>9}" for scale in SCALES) + f" {'growth':>7}")
+    worst_at_limit = 0.0
+    for name, build in ADVERSARIAL.items():
+        times = [worst_time(build(length * scale)) for scale in SCALES]
+        growth = max(b / a for a, b in zip(times, times[1:]) if a > 0)  # per 4x longer input
+        worst_at_limit = max(worst_at_limit, times[0])
+        print(f"{name:>22} " + " ".join(f"{t * 1000:>9.2f}" for t in times) + f" {growth:>6.1f}x")
+        if growth > MAX_GROWTH:
+            failures.append(f"{name}: grows {growth:.1f}x per 4x input")
+
+    fuzz_worst = 0.0
+    tag_mismatches = 0
+    for _ in range(fuzz_samples):
+        text = ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, length)))
+        fuzz_worst = max(fuzz_worst, worst_time(text))
+        tag_mismatches += strip_tags(text) != TAG_RE.sub(' ', text)
+    worst_at_limit = max(worst_at_limit, fuzz_worst)
+    print(f"\nrandom inputs: {fuzz_samples}, slowest {fuzz_worst * 1000:.2f} ms, "
+          f"strip_tags mismatches: {tag_mismatches}")
+    if tag_mismatches:
+        failures.append(f"strip_tags differs from the regex on {tag_mismatches} inputs")
+
+    huge = "URGENT verify your account " + "x" * (1 << 20) + " http://example.tk"
+    start = time.perf_counter()
+    excerpt = truncate_message(huge)
+    normalize_text(excerpt)
+    huge_time = time.perf_counter() - start
+    print(f"1 MB message: excerpt {len(excerpt)} chars, truncate + normalize {huge_time * 1000:.2f} ms")
+    if len(excerpt) > length or not excerpt.endswith("example.tk"):
+        failures.append("truncate_message did not keep a head + tail excerpt within the limit")
+
+    print(f"\nworst case at the limit: {worst_at_limit * 1000:.2f} ms (budget {budget_ms:g} ms)")
+    if worst_at_limit * 1000 > budget_ms:
+        failures.append(f"worst case {worst_at_limit * 1000:.2f} ms exceeds the {budget_ms:g} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: every input stays within budget and scales linearly")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Startup import-time report for app.py.
+
+Imports app in a fresh interpreter with -X importtime, prints the slowest
+top-level packages and fails if any of DEFERRED_MODULES was imported at
+startup. Run from the 'Smishing Detector' folder:
+
+    python benchmarks/startup_imports.py [module]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.startup_profile import DEFERRED_MODULES, import_time_report
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "app"
+    report = import_time_report(module)
+    print(report.format(count=15))
+
+    eager = report.imported(DEFERRED_MODULES)
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        sys.exit(1)
+    print("OK: no deferred module imported at startup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Vocabulary footprint: tfidf_vectorizer.joblib's dict vs the bundle's CompactVocabulary.
+
+Reports, for the vectorizer pickle and for the vocabulary arrays in the
+bundle:
+
+- size on disk (the pickle also holds idf_ and the vectorizer settings);
+- load time, in fresh interpreter processes, after the libraries are imported;
+- Python heap allocated by loading (tracemalloc; the bundle's arrays are
+  mapped, so they count as page cache, not heap);
+- lookup cost in ns per term, for known and unknown terms;
+- lookup cost in us per message over the corpus (the n-gram terms of each
+  normalized message), for the dict, for probing the bundle's hash table
+  term by term, and for lookup_many, the fused scorer's path;
+- pruned terms (stop_words_) still carried by the pickle, if any.
+
+Run from the 'Smishing Detector' folder:
+
+    python benchmarks/vocabulary_report.py [repeats]
+"""
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VECTORIZER_PATH = 'model/tfidf_vectorizer.joblib'
+BUNDLE_PATH = 'model/sms_model.bundle'
+DATA_PATH = 'model/sms_data_corrected.csv'
+
+CHILD = r"""
+import json, sys, time, tracemalloc
+sys.path.insert(0, '.')
+if sys.argv[1] == 'joblib':
+    import joblib
+    import sklearn.feature_extraction.text  # import cost is not part of the vocabulary's
+    load = lambda: joblib.load(sys.argv[2]).vocabulary_
+else:
+    from components.model_bundle import load_bundle
+    load = lambda: load_bundle(sys.argv[2]).fused_scorer.vocabulary
+tracemalloc.start()
+start = time.perf_counter()
+vocabulary = load()
+elapsed = time.perf_counter() - start
+heap = tracemalloc.get_traced_memory()[0]
+print(json.dumps({"load": elapsed, "heap": heap, "terms": len(vocabulary)}))
+"""
+
+
+def run(kind, path, repeats):
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, kind, path],
+            cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def lookup_ns(vocabulary, terms):
+    get = vocabulary.get
+    number = 20
+    seconds = min(timeit.repeat(lambda: [get(t) for t in terms], number=number, repeat=5))
+    return seconds / (number * len(terms)) * 1e9
+
+
+def message_us(lookup, documents):
+    """Median over 5 runs of the mean time to look up one message's terms."""
+    seconds = min(timeit.repeat(lambda: [lookup(terms) for terms in documents], number=1, repeat=5))
+    return seconds / len(documents) * 1e6
+
+
+def per_message(vectorizer, compact, scorer):
+    from components.preprocess import normalize_text
+
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        documents = [scorer.ngrams(normalize_text(row['TEXT'])) for row in csv.DictReader(f)]
+    n_terms = sum(len(terms) for terms in documents)
+    print(f"\nper message: {len(documents)} corpus messages, {n_terms / len(documents):.1f} terms each")
+    dict_get, compact_get = vectorizer.vocabulary_.get, compact.get
+    rows = (
+        ("dict", lambda terms: [dict_get(t) for t in terms]),
+        ("probing", lambda terms: [compact_get(t) for t in terms]),
+        ("lookup_many", compact.lookup_many),
+    )
+    for name, lookup in rows:
+        print(f"{name:>12} {message_us(lookup, documents):>6.1f} us/msg")
+    return sum(
+        compact.lookup_many(terms) != [dict_get(t) for t in terms] for terms in documents
+    )
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if not os.path.exists(os.path.join(APP_DIR, BUNDLE_PATH)):
+        sys.exit(f"{BUNDLE_PATH} not found; run model/export_bundle.py first.")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+    import joblib
+    from components.model_bundle import load_bundle
+
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    bundle = load_bundle(BUNDLE_PATH)
+    compact = bundle.fused_scorer.vocabulary
+    known = list(vectorizer.vocabulary_)
+    unknown = [f"{term}#" for term in known]
+    pruned = getattr(vectorizer, 'stop_words_', None)
+
+    print(f"median of {repeats} fresh processes")
+    print(f"{'format':>8} {'size KB':>8} {'load ms':>8} {'heap KB':>8} {'hit ns':>7} {'miss ns':>8}")
+    rows = (
+        ("joblib", VECTORIZER_PATH, os.path.getsize(VECTORIZER_PATH), vectorizer.vocabulary_),
+        ("bundle", BUNDLE_PATH, compact.nbytes, compact),
+    )
+    for kind, path, size, vocabulary in rows:
+        t = run(kind, path, repeats)
+        print(f"{kind:>8} {size / 1024:>8.1f} {t['load'] * 1000:>8.2f} {t['heap'] / 1024:>8.1f} "
+              f"{lookup_ns(vocabulary, known):>7.0f} {lookup_ns(vocabulary, unknown):>8.0f}")
+    print("\n(bundle size is the vocabulary arrays only; load and heap are for the whole bundle)")
+    print(f"terms: {len(compact)}, hash slots: {len(compact.arrays[2])}")
+    print(f"pruned terms in the pickle (stop_words_): {len(pruned) if pruned is not None else 'none stored'}")
+
+    mismatches = per_message(vectorizer, compact, bundle.fused_scorer)
+    mismatches += sum(compact.get(term) != idx for term, idx in vectorizer.vocabulary_.items())
+    mismatches += sum(term in compact for term in unknown)
+    if mismatches:
+        print(f"\nFAIL: {mismatches} terms map differently")
+        sys.exit(1)
+    print("\nOK: every term maps to the same feature id")
+
+
+if __name__ == "__main__":
+    main()
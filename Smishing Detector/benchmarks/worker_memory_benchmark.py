@@ -0,0 +1,128 @@
+"""
+Memory added per ProcessClassifier worker, with and without shared model arrays.
+
+For 1..N workers, in two modes:
+
+- load:   every worker joblib.loads the model and vectorizer itself;
+- shared: workers attach the parent's weights/idf (loaded from joblib) from
+          a memory-mapped temp file the parent writes;
+- bundle: the parent loads sms_model.bundle and workers map the bundle
+          file itself; no temp file is written.
+
+Reports total worker RSS and private (USS) memory, the growth per added
+worker, and, in shared mode, how many pages of the weights mapping each
+worker holds as its own copy (the mapping's Anonymous field). That must be
+zero: the pages are the page cache's, shared by every worker (with a single
+worker smaps lists them as private only because nobody else maps them yet).
+The script exits with status 1 otherwise. Linux only (reads /proc/<pid>/smaps).
+Run from the 'Smishing Detector' folder:
+
+    python benchmarks/worker_memory_benchmark.py [max_workers]
+"""
+import csv
+import os
+import sys
+
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.fused_scorer import build_fused_scorer
+from components.linear_model import to_linear_scorer
+from components.model_bundle import load_bundle
+from components.process_engine import ProcessClassifier
+
+DATA_PATH = 'model/sms_data_corrected.csv'
+MODEL_PATH = 'model/sms_model.joblib'
+VECTORIZER_PATH = 'model/tfidf_vectorizer.joblib'
+BUNDLE_PATH = 'model/sms_model.bundle'
+LABELS = ['ham', 'smishing', 'spam']
+SAMPLE_MESSAGES = 2000
+
+
+def smaps(pid):
+    """{mapping path: {field: kB}} summed per path, plus '*' for the whole process."""
+    mappings = {"*": {}}
+    path = None
+    with open(f"/proc/{pid}/smaps") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 5 and "-" in parts[0]:
+                path = parts[5] if len(parts) > 5 else ""
+                mappings.setdefault(path, {})
+            elif len(parts) == 3 and parts[2] == "kB":
+                field, value = parts[0].rstrip(":"), int(parts[1])
+                for key in (path, "*"):
+                    mappings[key][field] = mappings[key].get(field, 0) + value
+    return mappings
+
+
+def private_kb(fields):
+    return fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def measure(engine, messages):
+    # touch every worker's model data with real work first
+    engine.classify(messages)
+    rss = uss = shared_copied = 0
+    for pid in engine.worker_pids:
+        mappings = smaps(pid)
+        rss += mappings["*"].get("Rss", 0)
+        uss += private_kb(mappings["*"])
+        if engine.shared_arrays is not None:
+            shared_copied += mappings.get(engine.shared_arrays.path, {}).get("Anonymous", 0)
+    return rss, uss, shared_copied
+
+
+def main():
+    if not os.path.exists("/proc/self/smaps"):
+        sys.exit("This benchmark reads /proc/<pid>/smaps and only runs on Linux.")
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    with open(DATA_PATH, encoding='utf-8', errors='replace', newline='') as f:
+        messages = [row['TEXT'] for row in csv.DictReader(f)][:SAMPLE_MESSAGES]
+
+    model = to_linear_scorer(joblib.load(MODEL_PATH))
+    fused_scorer = build_fused_scorer(joblib.load(VECTORIZER_PATH), model)
+    if fused_scorer is None:
+        sys.exit("The model/vectorizer pair cannot use shared arrays.")
+
+    shared_scorers = {"load": None, "shared": fused_scorer, "bundle": load_bundle(BUNDLE_PATH).fused_scorer}
+
+    failed = False
+    growth_per_worker = {}
+    for mode, shared_scorer in shared_scorers.items():
+        print(f"\n[{mode}]")
+        print(f"{'workers':>7} {'RSS MB':>8} {'USS MB':>8} {'+USS/worker':>12} {'weights copied kB':>17}")
+        first_uss = previous_uss = None
+        for n in range(1, max_workers + 1):
+            engine = ProcessClassifier(
+                MODEL_PATH, VECTORIZER_PATH, LABELS, processes=n, shared_scorer=shared_scorer
+            ).start()
+            try:
+                rss, uss, shared_copied = measure(engine, messages)
+                weights_kb = engine.shared_arrays.nbytes // 1024 if engine.shared_arrays else 0
+                if mode == "bundle" and engine.shared_arrays.path != os.path.abspath(BUNDLE_PATH):
+                    print(f"FAIL: bundle arrays were copied to {engine.shared_arrays.path}")
+                    failed = True
+            finally:
+                engine.close()
+            growth = f"{(uss - previous_uss) / 1024:11.1f}" if previous_uss is not None else f"{'-':>11}"
+            shared = f"{shared_copied:>7} of {weights_kb}" if shared_scorer is not None else "-"
+            print(f"{n:>7} {rss / 1024:>8.1f} {uss / 1024:>8.1f} {growth} MB {shared:>17}")
+            first_uss = first_uss if first_uss is not None else uss
+            previous_uss = uss
+            failed |= shared_copied > 0
+        if max_workers > 1:
+            growth_per_worker[mode] = (previous_uss - first_uss) / (max_workers - 1)
+
+    if growth_per_worker:
+        for mode in ("shared", "bundle"):
+            saved = growth_per_worker["load"] - growth_per_worker[mode]
+            print(f"\nprivate memory saved per extra worker ({mode}): {saved / 1024:.2f} MB")
+    if failed:
+        print("\nFAIL: workers hold private copies of the shared model arrays, or the bundle was copied")
+        sys.exit(1)
+    print("\nOK: shared model arrays add no private memory per worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# classifier.py
+"""
+UI-independent classification of many SMS at once.
+
+Used for bulk ingestion, backlog replay and benchmarks: cleaning runs in bulk
+through clean_texts, the whole batch goes through one VECTORIZER.transform and
+one model call, and every message gets its label, decision scores and
+extracted URL/email/phone/domain features. With a FusedTfidfScorer the
+cleaned token lists are vectorized as they are, without re-tokenizing.
+Each message is scanned for entities once for the warning features. For
+indicator-layout models that scan also feeds the anonymization; tagged-layout
+models keep normalize_text's own entity pass, which the trained features
+depend on. Messages longer than max_length are classified on
+truncate_message's excerpt.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from components.feature_extraction import extract_features, scan_entities
+from components.preprocess import (
+    MAX_MESSAGE_LENGTH, clean_text, clean_token_lists, clean_texts, clean_tokens, clean_tokens_indicators,
+    indicator_token_lists, truncate_message
+)
+
+Classification = namedtuple(
+    "Classification", ["message", "label", "label_idx", "scores", "features", "text_clean"]
+)
+
+
+def predict_with_scores(model, X):
+    """(label indices, decision scores) for a matrix, with a single model call when possible."""
+    scores = model.decision_function(X)
+    if hasattr(model, "votes"):
+        return model.classes_[model.votes(scores).argmax(axis=1)], scores
+    return model.predict(X), scores
+
+
+def clean_for_scorer(messages, fused_scorer, batch_size=256, entity_lists=None):
+    """
+    (token lists, indicator id lists) for raw messages, in the layout fused_scorer expects.
+
+    The indicator lists are None for a model trained on the tagged layout.
+    entity_lists (scan_entities per message) saves rescanning them.
+    """
+    if fused_scorer.n_indicators:
+        pairs = list(indicator_token_lists(messages, batch_size=batch_size, entity_lists=entity_lists))
+        return [tokens for tokens, _ in pairs], [indicators for _, indicators in pairs]
+    return list(clean_token_lists(messages, batch_size=batch_size)), None
+
+
+def classify_message(message, model, vectorizer, labels, cache=None, fused_scorer=None,
+                     max_length=MAX_MESSAGE_LENGTH):
+    """
+    Classify one raw SMS; returns a Classification.
+
+    Uses the fused single-message path when a FusedTfidfScorer is given and
+    falls back to vectorizer.transform + model otherwise. Only the first
+    max_length characters' worth (truncate_message) are cleaned and scanned;
+    Classification.message is the full text.
+    """
+    text = truncate_message(message, max_length)
+    entities = scan_entities(text)
+    cached = cache.get(text) if cache is not None else None
+    if cached is None:
+        if fused_scorer is not None:
+            if fused_scorer.n_indicators:
+                tokens, indicators = clean_tokens_indicators(text, entities)
+            else:
+                tokens, indicators = clean_tokens(text), None
+            text_clean = ' '.join(tokens)
+            _, scores, label_idx = fused_scorer.classify_tokens(tokens, indicators)
+        else:
+            text_clean = clean_text(text)
+            vector = vectorizer.transform([text_clean])
+            label_idxs, scores = predict_with_scores(model, vector)
+            label_idx, scores = label_idxs[0], np.asarray(scores)[0]
+        label_idx = int(label_idx)
+        if cache is not None:
+            cache.put(text, text_clean, label_idx, scores)
+    else:
+        text_clean, label_idx, scores = cached.text_clean, cached.label_idx, cached.scores
+
+    return Classification(
+        message=message,
+        label=labels[label_idx],
+        label_idx=label_idx,
+        scores=scores,
+        features=extract_features(text, entities),
+        text_clean=text_clean,
+    )
+
+
+def classify_batch(messages, model, vectorizer, labels, cache=None, batch_size=256, with_features=True,
+                   fused_scorer=None, max_length=MAX_MESSAGE_LENGTH):
+    """
+    Classify a list of raw SMS texts; returns one Classification per message, in order.
+
+    Messages found in `cache` (a PredictionCache) skip cleaning and scoring; the
+    rest are cleaned in bulk, vectorized with one transform and scored with one
+    model call, then added to the cache. A fused_scorer, when given, replaces
+    vectorizer and vectorizes the cleaned token lists directly. Messages over
+    max_length characters are classified on their truncate_message excerpt.
+    """
+    messages = [message if isinstance(message, str) else "" for message in messages]
+    texts = [truncate_message(message, max_length) for message in messages]
+    needs_entities = with_features or (fused_scorer is not None and fused_scorer.n_indicators)
+    entity_lists = [scan_entities(text) for text in texts] if needs_entities else None
+    results = [None] * len(messages)
+    misses = []
+    for i, text in enumerate(texts):
+        cached = cache.get(text) if cache is not None else None
+        if cached is None:
+            misses.append(i)
+        else:
+            results[i] = (cached.text_clean, cached.label_idx, cached.scores)
+
+    if misses:
+        pending = (texts[i] for i in misses)
+        if fused_scorer is not None:
+            token_lists, indicator_lists = clean_for_scorer(
+                pending, fused_scorer, batch_size=batch_size,
+                entity_lists=[entity_lists[i] for i in misses] if entity_lists is not None else None
+            )
+            cleaned = [' '.join(tokens) for tokens in token_lists]
+            X = fused_scorer.transform_tokens(token_lists, indicator_lists)
+        else:
+            cleaned = list(clean_texts(pending, batch_size=batch_size))
+            X = vectorizer.transform(cleaned)
+        label_idxs, scores = predict_with_scores(model, X)
+        scores = np.asarray(scores)
+        for row, i in enumerate(misses):
+            label_idx = int(label_idxs[row])
+            if cache is not None:
+                cache.put(texts[i], cleaned[row], label_idx, scores[row])
+            results[i] = (cleaned[row], label_idx, scores[row])
+
+    return [
+        Classification(
+            message=message,
+            label=labels[label_idx],
+            label_idx=label_idx,
+            scores=scores,
+            features=extract_features(texts[i], entity_lists[i]) if with_features else None,
+            text_clean=text_clean,
+        )
+        for i, (message, (text_clean, label_idx, scores)) in enumerate(zip(messages, results))
+    ]
@@ -1,25 +1,114 @@
 # feature_extraction.py
+"""
+Entity scanning for warnings and the indicator layout's anonymization.
+
+scan_entities finds URLs, emails, phone numbers, domains, money amounts and
+numbers in one left-to-right pass and returns typed, positioned spans; the
+warning features (extract_features) and normalize_text_indicators both
+work from that one list. Spans never overlap: where two entities would,
+the one starting first wins, then URL > EMAIL > PHONE > MONEY > DOMAIN >
+NUM. So digits inside a URL or email are not also a phone number, and a
+URL's host is not also a domain.
+
+Messages come from any phone on the network, so the scanner's patterns
+must not backtrack badly on crafted input. Unbounded, the domain and email
+patterns retry a whole dotted chain or word run from every position
+inside it (quadratic: "a.a.a...a1"); the scanner caps them at the DNS and
+RFC 5321 limits (63-char labels, 10 labels, 64-char local part), which
+bounds the work per position. PHONE, URL, MONEY and NUM are linear as
+they are.
+"""
+import itertools
 import re
+from collections import namedtuple
 
 # Patterns
 URL_PATTERN = r"(https?://[^\s]+|www\.[^\s]+)"
 PHONE_PATTERN = r"\+?\d[\d\s().-]{6,}\d"
 DOMAIN_PATTERN = r"\b(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}\b"
 EMAIL_PATTERN = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"
+# Scanner versions: bounded, and a domain may not run into a URL that starts
+# later, at a label ("details.www.x.tk") or at the TLD ("now.http://bit.ly")
+_SCANNER_DOMAIN_PATTERN = (
+    r"\b(?:(?!www\.|https?://)[a-zA-Z0-9-]{1,63}\.){1,10}(?!https?://)[a-zA-Z]{2,63}\b(?!\.[a-zA-Z0-9])"
+)
+_SCANNER_EMAIL_PATTERN = r"[a-zA-Z0-9_.+-]{1,64}@[a-zA-Z0-9-]{1,63}\.[a-zA-Z0-9-.]{1,252}"
+MONEY_PATTERN = r"[$£€₺]\s*\d+|\d+\s*(?:(?i:usd|eur|tl)\b|[$£€₺])"
+NUMBER_PATTERN = r"\d+"
+
+ENTITY_KINDS = ("URL", "EMAIL", "PHONE", "MONEY", "DOMAIN", "NUM")
+_ENTITY_PATTERNS = {
+    "URL": URL_PATTERN, "EMAIL": _SCANNER_EMAIL_PATTERN, "PHONE": PHONE_PATTERN,
+    "MONEY": MONEY_PATTERN, "DOMAIN": _SCANNER_DOMAIN_PATTERN, "NUM": NUMBER_PATTERN,
+}
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _build_scanners():
+    """
+    One alternation per (has '@', has '.', has a digit) combination.
+
+    Every alternative is tried at every position, so leaving out the ones a
+    message cannot match (no digit: no PHONE/MONEY/NUM, no '.': no DOMAIN or
+    EMAIL) makes the pass cheaper without changing what it finds.
+    """
+    scanners = {}
+    for has_at, has_dot, has_digit in itertools.product((False, True), repeat=3):
+        kinds = [
+            kind for kind in ENTITY_KINDS
+            if (kind != "EMAIL" or (has_at and has_dot))
+            and (kind != "DOMAIN" or has_dot)
+            and (kind not in ("PHONE", "MONEY", "NUM") or has_digit)
+        ]
+        scanners[has_at, has_dot, has_digit] = re.compile(
+            '|'.join(f"(?P<{kind}>{_ENTITY_PATTERNS[kind]})" for kind in kinds)
+        )
+    return scanners
+
+_SCANNERS = _build_scanners()
+
+# extract_features key for each entity kind shown in the warnings
+_FEATURE_KEYS = {"URL": "urls", "EMAIL": "emails", "PHONE": "phones", "DOMAIN": "domains"}
+
+Entity = namedtuple("Entity", ["kind", "start", "end", "text"])
+
+
+def scan_entities(text):
+    """All entities in text as Entity(kind, start, end, text), in order of position."""
+    if not isinstance(text, str):
+        return []
+    scanner = _SCANNERS['@' in text, '.' in text, _DIGIT_RE.search(text) is not None]
+    return [
+        Entity(match.lastgroup, match.start(), match.end(), match.group())
+        for match in scanner.finditer(text)
+    ]
+
+
+def features_from_entities(entities):
+    """The extract_features dict for already scanned entities."""
+    features = {'urls': [], 'emails': [], 'phones': [], 'domains': []}
+    for entity in entities:
+        key = _FEATURE_KEYS.get(entity.kind)
+        if key is not None:
+            features[key].append(entity.text)
+    return features
+
 
 # Functions
 def detect_urls(text):
-    return re.findall(URL_PATTERN, text)
+    return features_from_entities(scan_entities(text))['urls']
 
 def detect_emails(text):
-    return re.findall(EMAIL_PATTERN, text)
+    return features_from_entities(scan_entities(text))['emails']
 
 def detect_phone_numbers(text):
     # returns raw matches; may include separators
-    return re.findall(PHONE_PATTERN, text)
+    return features_from_entities(scan_entities(text))['phones']
 
 def detect_domains(text):
-    # remove full URLs & emails so we don't double-detect
-    t = re.sub(URL_PATTERN, " ", text)
-    t = re.sub(EMAIL_PATTERN, " ", t)
-    return re.findall(DOMAIN_PATTERN, t)
\ No newline at end of file
+    # URLs and emails are separate entities, so their hosts are not reported here
+    return features_from_entities(scan_entities(text))['domains']
+
+def extract_features(text, entities=None):
+    """Extract URLs, emails, phone numbers, and domains from text (or its scanned entities)."""
+    return features_from_entities(scan_entities(text) if entities is None else entities)
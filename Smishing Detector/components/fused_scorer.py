@@ -0,0 +1,215 @@
+# fused_scorer.py
+"""
+Single-message TF-IDF vectorization and linear scoring in one step.
+
+VECTORIZER.transform([text]) goes through sklearn's generic analyzer and
+builds a scipy CSR matrix before the model ever sees it. For one cleaned SMS
+this does the same work directly: tokens -> vocabulary ids -> counts -> idf ->
+L2 norm -> per-pair decision values, with no intermediate matrix.
+
+The *_tokens methods take clean_tokens() output instead of the joined
+string; the terms, and so the features, are the same as for ' '.join(tokens).
+
+A model trained with the indicator layout (preprocess.INDICATOR_NAMES) has
+n_indicators more weight rows: the indicator ids from
+clean_tokens_indicators() become 1.0 features after the TF-IDF columns.
+"""
+import math
+import re
+
+import numpy as np
+
+from components.preprocess import INDICATOR_NAMES
+
+# TfidfVectorizer's default token_pattern: runs of 2+ word characters
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+# distinct clean_tokens() tokens whose pattern matches are memoized (then reset)
+TOKEN_CACHE_SIZE = 50000
+
+
+class FusedTfidfScorer:
+    """Reproduces a fitted word-level TfidfVectorizer followed by a LinearSVCScorer, for one text at a time."""
+
+    def __init__(self, vocabulary, idf, scorer, token_pattern=DEFAULT_TOKEN_PATTERN, ngram_range=(1, 2), lowercase=True,
+                 n_indicators=0):
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.scorer = scorer
+        self.n_indicators = n_indicators
+        self.token_re = re.compile(token_pattern)
+        self._word_runs = token_pattern == DEFAULT_TOKEN_PATTERN
+        self._token_words = {}
+        self.min_n, self.max_n = ngram_range
+        self.lowercase = lowercase
+        if self.token_re.groups > 1:
+            raise ValueError("token_pattern may contain at most one capturing group")
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer, scorer):
+        """Build from a fitted TfidfVectorizer; raises ValueError for settings this path does not reproduce."""
+        params = vectorizer.get_params()
+        unsupported = {
+            "analyzer": "word", "tokenizer": None, "preprocessor": None, "stop_words": None,
+            "strip_accents": None, "input": "content", "binary": False, "use_idf": True,
+            "sublinear_tf": False, "norm": "l2",
+        }
+        for name, expected in unsupported.items():
+            if params.get(name) != expected:
+                raise ValueError(f"Unsupported TfidfVectorizer setting {name}={params.get(name)!r}")
+        # indicator-layout models have one weight row per INDICATOR_NAMES entry after the terms
+        n_indicators = scorer.weights.shape[0] - len(vectorizer.idf_) if hasattr(scorer, "weights") else -1
+        if n_indicators not in (0, len(INDICATOR_NAMES)):
+            raise ValueError("Scorer weights do not match the vectorizer vocabulary")
+        return cls(
+            vectorizer.vocabulary_,
+            vectorizer.idf_,
+            scorer,
+            token_pattern=params["token_pattern"],
+            ngram_range=params["ngram_range"],
+            lowercase=params["lowercase"],
+            n_indicators=n_indicators,
+        )
+
+    @property
+    def n_features(self):
+        """TF-IDF terms plus indicator columns: the width of the scorer's input."""
+        return len(self.idf) + self.n_indicators
+
+    # ---------- Vectorization ----------
+    def ngrams(self, text):
+        """Same terms, in the same order, as TfidfVectorizer.build_analyzer()(text)."""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_re.findall(text)
+        return self._ngrams_from_tokens(tokens)
+
+    def ngrams_from_tokens(self, tokens):
+        """Same terms as ngrams(' '.join(tokens)), without building and re-splitting the string."""
+        if not self._word_runs:
+            # a custom pattern may match across the joining spaces
+            return self.ngrams(" ".join(tokens))
+        # A space is no word character, so on the joined string the default
+        # pattern matches within each token separately; the matches of each
+        # distinct token are computed once.
+        words = []
+        cache = self._token_words
+        for token in tokens:
+            found = cache.get(token)
+            if found is None:
+                if len(cache) >= TOKEN_CACHE_SIZE:
+                    cache.clear()
+                found = cache[token] = tuple(self.token_re.findall(token.lower() if self.lowercase else token))
+            words += found
+        return self._ngrams_from_tokens(words)
+
+    def _ngrams_from_tokens(self, tokens):
+        min_n, max_n = self.min_n, self.max_n
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(min_n, 2), min(max_n, n_tokens) + 1):
+            for i in range(n_tokens - n + 1):
+                terms.append(" ".join(tokens[i:i + n]))
+        return terms
+
+    def _vectorize_terms(self, terms):
+        counts = {}
+        vocabulary = self.vocabulary
+        # a CompactVocabulary looks up a whole document in one call
+        ids = vocabulary.lookup_many(terms) if hasattr(vocabulary, "lookup_many") else map(vocabulary.get, terms)
+        for idx in ids:
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+        if not counts:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+        ids = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        values *= self.idf[ids]
+        norm = math.sqrt(float(values @ values))
+        if norm > 0:
+            values /= norm
+        return ids, values
+
+    def vectorize(self, text):
+        """Sparse TF-IDF row of one cleaned text as (feature ids, values)."""
+        return self._vectorize_terms(self.ngrams(text))
+
+    def vectorize_tokens(self, tokens, indicators=None):
+        """vectorize() for a clean_tokens() list, plus the indicator features if given."""
+        ids, values = self._vectorize_terms(self.ngrams_from_tokens(tokens))
+        if indicators:
+            ids = np.concatenate([ids, np.asarray(indicators, dtype=np.intp) + len(self.idf)])
+            values = np.concatenate([values, np.ones(len(indicators))])
+        return ids, values
+
+    def transform(self, texts):
+        """CSR matrix for many cleaned texts; stands in for TfidfVectorizer.transform."""
+        return self._to_csr([self.vectorize(text) for text in texts])
+
+    def transform_tokens(self, token_lists, indicator_lists=None):
+        """transform() for clean_tokens() lists (and their indicator ids)."""
+        if indicator_lists is None:
+            return self._to_csr([self.vectorize_tokens(tokens) for tokens in token_lists])
+        return self._to_csr([
+            self.vectorize_tokens(tokens, indicators) for tokens, indicators in zip(token_lists, indicator_lists)
+        ])
+
+    def _to_csr(self, rows):
+        from scipy.sparse import csr_matrix
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.intp)
+        np.cumsum([len(ids) for ids, _ in rows], out=indptr[1:])
+        indices = np.concatenate([ids for ids, _ in rows]) if rows else np.empty(0, dtype=np.intp)
+        data = np.concatenate([values for _, values in rows]) if rows else np.empty(0)
+        return csr_matrix((data, indices, indptr), shape=(len(rows), self.n_features))
+
+    # ---------- Scoring ----------
+    def decision_function_features(self, features):
+        ids, values = features
+        return values @ self.scorer.weights[ids] + self.scorer.intercepts
+
+    def predict_features(self, features):
+        return self._label(self.decision_function_features(features))
+
+    def _label(self, decisions):
+        return self.scorer.classes_[self.scorer.votes(decisions)[0].argmax()]
+
+    def decision_function(self, text):
+        """One-vs-one decision values for one cleaned text."""
+        return self.decision_function_features(self.vectorize(text))
+
+    def classify(self, text):
+        """(features, decision values, class) for one cleaned text."""
+        return self._classify_features(self.vectorize(text))
+
+    def classify_tokens(self, tokens, indicators=None):
+        """classify() for a clean_tokens() list (and its indicator ids)."""
+        return self._classify_features(self.vectorize_tokens(tokens, indicators))
+
+    def _classify_features(self, features):
+        decisions = self.decision_function_features(features)
+        return features, decisions, self._label(decisions)
+
+    def predict(self, text):
+        """Predicted class for one cleaned text; same as model.predict(vectorizer.transform([text]))[0]."""
+        return self.predict_features(self.vectorize(text))
+
+
+def indicator_matrix(indicator_lists):
+    """CSR block of the indicator features (one column per INDICATOR_NAMES entry) for training."""
+    from scipy.sparse import csr_matrix
+
+    indptr = np.zeros(len(indicator_lists) + 1, dtype=np.intp)
+    np.cumsum([len(indicators) for indicators in indicator_lists], out=indptr[1:])
+    indices = np.fromiter((i for indicators in indicator_lists for i in indicators), dtype=np.intp, count=indptr[-1])
+    return csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(indicator_lists), len(INDICATOR_NAMES)))
+
+
+def build_fused_scorer(vectorizer, scorer):
+    """FusedTfidfScorer for this pair, or None if the vectorizer/model cannot use the fast path."""
+    try:
+        return FusedTfidfScorer.from_vectorizer(vectorizer, scorer)
+    except (AttributeError, ValueError):
+        return None
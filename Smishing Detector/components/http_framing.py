@@ -0,0 +1,245 @@
+# http_framing.py
+import json
+from collections import namedtuple
+
+# Limits per request; a connection that exceeds them cannot be resynchronized
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+HEADER_END = b'\r\n\r\n'
+CRLF = b'\r\n'
+DIGITS = '0123456789'
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+
+HttpRequest = namedtuple("HttpRequest", ["method", "target", "version", "headers", "body"])
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    503: "Service Unavailable",
+}
+
+
+class HttpFramingError(ValueError):
+    """
+    The byte stream is not valid HTTP/1.x request framing.
+
+    `status` is the response code to answer with; `requests` holds the
+    requests that the same feed() completed before the error.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+        self.requests = []
+
+
+def wants_keep_alive(request):
+    """Whether the client expects the connection to stay open after this request."""
+    return _keeps_alive(request.version, request.headers)
+
+
+def _keeps_alive(version, headers):
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        return 'keep-alive' in connection
+    return 'close' not in connection
+
+
+def build_response(status, payload, keep_alive=True, headers=None):
+    """A complete HTTP/1.1 response with `payload` as its JSON body."""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class HttpRequestParser:
+    """
+    Incremental HTTP/1.x request parser for one connection.
+
+    feed() takes whatever recv returned and gives back every request it
+    completed, in order: none while a request is still partial, several when
+    back-to-back requests arrived in one read. Bodies are delimited by
+    Content-Length or by chunked Transfer-Encoding. A POST with neither
+    (the phone app's hand-written requests) is only accepted on a
+    connection that closes after the response: it gets the bytes that
+    arrived with its head as body, as the receiver always did. On a
+    keep-alive connection that would swallow any request pipelined after
+    it, so there it is refused with 411. Other methods without either
+    header have no body.
+
+    Unconsumed bytes stay in one bytearray; nothing already parsed is scanned
+    again, and headers are only parsed once the blank line has arrived.
+    Header names are lower-cased; repeated headers are joined with ", ".
+    """
+
+    def __init__(self, max_header_size=MAX_HEADER_SIZE, max_body_size=MAX_BODY_SIZE):
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+
+        self._buffer = bytearray()
+        self._pos = 0           # start of the unconsumed bytes
+        self._scanned = 0       # HEADER_END / CRLF cannot start before this
+        self._head = None       # (method, target, version, headers) of the request being read
+        self._body_length = None
+        self._chunks = None     # body so far, for chunked requests
+        self._chunk_left = 0    # bytes of the current chunk still to read
+        self._in_trailers = False
+
+    @property
+    def pending(self):
+        """Bytes received but not yet part of a complete request."""
+        return len(self._buffer) - self._pos
+
+    def feed(self, data):
+        """Add received bytes; returns the list of HttpRequests they completed."""
+        self._buffer += data
+        requests = []
+        try:
+            while True:
+                request = self._next_request()
+                if request is None:
+                    break
+                requests.append(request)
+        except HttpFramingError as e:
+            e.requests = requests
+            raise
+        if self._pos:
+            del self._buffer[:self._pos]
+            self._scanned = max(self._scanned - self._pos, 0)
+            self._pos = 0
+        return requests
+
+    # ---------- Parsing ----------
+    def _next_request(self):
+        if self._head is None and not self._read_head():
+            return None
+        if self._chunks is not None:
+            body = self._read_chunked()
+        else:
+            body = self._read_sized()
+        if body is None:
+            return None
+        method, target, version, headers = self._head
+        self._head = None
+        self._chunks = None
+        return HttpRequest(method, target, version, headers, body)
+
+    def _read_head(self):
+        buffer = self._buffer
+        # Blank lines between requests are allowed (RFC 9112 2.2)
+        while buffer.startswith(CRLF, self._pos):
+            self._pos += 2
+        if self._pos == len(buffer):
+            return False
+        end = buffer.find(HEADER_END, max(self._pos, self._scanned - 3))
+        if end == -1:
+            if len(buffer) - self._pos > self.max_header_size:
+                raise HttpFramingError(f"request head larger than {self.max_header_size} bytes", 431)
+            self._scanned = len(buffer)
+            return False
+        if end - self._pos > self.max_header_size:
+            raise HttpFramingError(f"request head larger than {self.max_header_size} bytes", 431)
+
+        lines = bytes(buffer[self._pos:end]).decode('latin-1').split('\r\n')
+        self._pos = self._scanned = end + len(HEADER_END)
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HttpFramingError(f"malformed request line {lines[0][:80]!r}") from None
+        if not version.startswith('HTTP/1.'):
+            raise HttpFramingError(f"unsupported protocol {version[:20]!r}")
+
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if not sep or not name or name != name.strip():
+                raise HttpFramingError(f"malformed header line {line[:80]!r}")
+            name, value = name.lower(), value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        self._head = (method, target, version, headers)
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            self._chunks = bytearray()
+            self._chunk_left = 0
+            self._in_trailers = False
+        elif 'content-length' in headers:
+            self._body_length = self._content_length(headers['content-length'])
+        elif method != 'POST':
+            self._body_length = 0
+        elif _keeps_alive(version, headers):
+            raise HttpFramingError("a POST on a keep-alive connection needs Content-Length", 411)
+        else:
+            self._body_length = None  # legacy: the rest of what arrived; the connection closes after it
+        return True
+
+    def _content_length(self, value):
+        lengths = {part.strip() for part in value.split(',')}
+        length = lengths.pop()
+        if lengths or not length or length.strip(DIGITS):
+            raise HttpFramingError(f"invalid Content-Length {value[:40]!r}")
+        length = int(length)
+        if length > self.max_body_size:
+            raise HttpFramingError(f"body of {length} bytes exceeds {self.max_body_size}", 413)
+        return length
+
+    def _read_sized(self):
+        start = self._pos
+        if self._body_length is None:
+            end = len(self._buffer)
+        else:
+            end = start + self._body_length
+            if end > len(self._buffer):
+                return None
+        self._pos = self._scanned = end
+        return bytes(self._buffer[start:end])
+
+    def _read_chunked(self):
+        buffer = self._buffer
+        while True:
+            if self._chunk_left:
+                # Chunk data and its CRLF are taken in one piece
+                end = self._pos + self._chunk_left
+                if end + 2 > len(buffer):
+                    return None
+                if buffer[end:end + 2] != CRLF:
+                    raise HttpFramingError("chunk data not followed by CRLF")
+                self._chunks += buffer[self._pos:end]
+                self._pos = self._scanned = end + 2
+                self._chunk_left = 0
+                continue
+
+            line_end = buffer.find(CRLF, max(self._pos, self._scanned - 1))
+            if line_end == -1:
+                if len(buffer) - self._pos > self.max_header_size:
+                    raise HttpFramingError("chunk size or trailer line too long")
+                self._scanned = len(buffer)
+                return None
+            line = bytes(buffer[self._pos:line_end])
+            self._pos = self._scanned = line_end + 2
+
+            if self._in_trailers:
+                if not line:
+                    return bytes(self._chunks)
+                continue
+            size = line.split(b';', 1)[0].strip()
+            if not size or size.strip(HEX_DIGITS):
+                raise HttpFramingError(f"invalid chunk size {line[:20]!r}")
+            size = int(size, 16)
+            if size == 0:
+                self._in_trailers = True
+            elif len(self._chunks) + size > self.max_body_size:
+                raise HttpFramingError(f"chunked body exceeds {self.max_body_size} bytes", 413)
+            else:
+                self._chunk_left = size
@@ -0,0 +1,159 @@
+# inference_pool.py
+import os
+import threading
+
+from components.ingest_queue import REJECT, IngestQueue, QueueFull
+
+_REFUSED = object()  # a sequence number whose job the ingest queue refused
+
+
+class JobDropped(Exception):
+    """Passed to error_fn for a job evicted from a full ingest queue (drop_oldest policy)."""
+
+
+class InferencePool:
+    """
+    Classification worker threads fed by a queue, with results handed back to Tk in order.
+
+    submit() is thread-safe and can be called from the network thread. Each
+    worker takes one job, plus whatever else is already queued (up to
+    max_batch), and runs work_fn(jobs) -> results off the GUI thread. Results
+    are collected by a poll on the Tk main loop and passed to
+    result_fn(job, result) / error_fn(job, exception) strictly in submission
+    order, so the log never reorders messages. Both handlers are looked up
+    at each delivery, so they can be replaced while jobs are in flight (the
+    app does so when it closes).
+
+    The jobs wait in ingest_queue, which holds at most `capacity` of them.
+    When it is full, `policy` decides (see components.ingest_queue):
+    submit() waits or raises QueueFull, or the oldest queued jobs reach
+    error_fn as JobDropped.
+    """
+
+    def __init__(self, root, work_fn, result_fn, error_fn, workers=None, max_batch=32, poll_ms=30,
+                 capacity=None, policy=REJECT, block_timeout=5.0):
+        self.root = root
+        self.work_fn = work_fn
+        self.result_fn = result_fn
+        self.error_fn = error_fn
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.poll_ms = poll_ms
+
+        self.ingest_queue = IngestQueue(capacity, policy, block_timeout, on_drop=self._record_dropped)
+        self._done = {}
+        self._done_lock = threading.Lock()
+        self._submitted = 0
+        self._next_seq = 0
+        self._threads = []
+        self._delivering = False
+        self.is_running = False
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        if self.is_running:
+            return self
+        self.is_running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True, name=f"Inference-Worker-{i}")
+            thread.start()
+            self._threads.append(thread)
+        self.root.after(self.poll_ms, self._poll)
+        return self
+
+    def shutdown(self, wait=True, timeout=2):
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.ingest_queue.close()  # workers finish what is queued, then exit
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout=timeout)
+        self._threads = []
+
+    # ---------- Submission ----------
+    def submit(self, job, force=False):
+        """
+        Queue a job from any thread; returns its sequence number.
+
+        Raises QueueFull if the ingest queue refuses it; force=True queues it
+        even when the queue is full.
+        """
+        return self.submit_many([job], force)[0]
+
+    def submit_many(self, jobs, force=False):
+        """Queue several jobs back to back (all or none, like submit); returns their sequence numbers."""
+        jobs = list(jobs)
+        with self._done_lock:
+            first = self._submitted
+            self._submitted += len(jobs)
+        seqs = range(first, first + len(jobs))
+        # Outside _done_lock: under the block policy this waits for the workers
+        try:
+            self.ingest_queue.put_many(zip(seqs, jobs), force)
+        except QueueFull:
+            with self._done_lock:
+                for seq in seqs:
+                    self._done[seq] = _REFUSED  # delivery skips these
+            raise
+        return list(seqs)
+
+    def _record_dropped(self, item):
+        seq, job = item
+        with self._done_lock:
+            self._done[seq] = (job, None, JobDropped("dropped from the full ingest queue"))
+
+    @property
+    def pending(self):
+        """Jobs submitted but not yet delivered to result_fn/error_fn."""
+        with self._done_lock:
+            return self._submitted - self._next_seq
+
+    # ---------- Worker side ----------
+    def _run(self, jobs):
+        """[(result, error)] per job; a failed batch is retried one job at a time."""
+        try:
+            return [(result, None) for result in self.work_fn(jobs)]
+        except Exception as e:
+            if len(jobs) == 1:
+                return [(None, e)]
+        return [self._run([job])[0] for job in jobs]
+
+    def _worker_loop(self):
+        while True:
+            batch = self.ingest_queue.get_batch(self.max_batch)
+            if not batch:  # closed and empty
+                return
+            outcomes = self._run([job for _, job in batch])
+            with self._done_lock:
+                for (seq, job), (result, error) in zip(batch, outcomes):
+                    self._done[seq] = (job, result, error)
+
+    # ---------- Tk side ----------
+    def _poll(self):
+        if not self._delivering:  # result_fn may open a modal dialog that re-enters the loop
+            self._delivering = True
+            try:
+                self._deliver_ready()
+            finally:
+                self._delivering = False
+        if self.is_running or self.pending:  # after shutdown, until the drained jobs are delivered
+            self.root.after(self.poll_ms, self._poll)
+
+    def _deliver_ready(self):
+        while True:
+            with self._done_lock:
+                item = self._done.pop(self._next_seq, None)
+                if item is None:
+                    return
+                self._next_seq += 1
+            if item is _REFUSED:
+                continue
+            job, result, error = item
+            try:
+                if error is None:
+                    self.result_fn(job, result)
+                else:
+                    self.error_fn(job, error)
+            except Exception as e:
+                print(f"WARNING: Inference result handler failed: {e}")
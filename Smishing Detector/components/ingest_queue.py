@@ -0,0 +1,144 @@
+# ingest_queue.py
+import threading
+import time
+from collections import deque, namedtuple
+
+# What put_many does when the items do not fit
+BLOCK = "block"              # wait up to block_timeout for room, then refuse
+REJECT = "reject"            # refuse at once (the receiver answers 503)
+DROP_OLDEST = "drop_oldest"  # evict the oldest queued items to make room
+POLICIES = (BLOCK, REJECT, DROP_OLDEST)
+
+IngestStats = namedtuple("IngestStats", ["depth", "capacity", "high_water", "accepted", "rejected", "dropped"])
+
+
+class QueueFull(Exception):
+    """The queue had no room and its policy refused the items."""
+
+
+class QueueClosed(QueueFull):
+    """The queue is closed and takes no more items."""
+
+
+class IngestQueue:
+    """
+    Bounded, thread-safe FIFO between the network receiver and the classification workers.
+
+    capacity=None means unbounded. When items do not fit, `policy` decides:
+    BLOCK waits (up to block_timeout seconds) for the workers to make room,
+    REJECT raises QueueFull at once, DROP_OLDEST evicts the oldest items
+    and hands each to on_drop(item). A put_many goes in whole or not at all,
+    so a bulk upload is never half queued. Counters for stats() are kept
+    under the same lock as the items.
+
+    close() refuses further puts and lets get_batch() return [] once the
+    queue is empty; drain() waits for the consumers to take everything.
+    """
+
+    def __init__(self, capacity=None, policy=REJECT, block_timeout=5.0, on_drop=None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown ingest queue policy {policy!r}; expected one of {POLICIES}")
+        self.capacity = capacity or None
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.on_drop = on_drop
+
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._emptied = threading.Condition(self._lock)
+        self._closed = False
+        self._high_water = 0
+        self._accepted = 0
+        self._rejected = 0
+        self._dropped = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    # ---------- Producer side ----------
+    def put(self, item, force=False):
+        self.put_many((item,), force)
+
+    def put_many(self, items, force=False):
+        """
+        Queue items in order, all or none; raises QueueFull (QueueClosed) if refused.
+
+        force=True queues them even past capacity (e.g. a message typed in
+        the UI, which must not be refused because phones filled the queue).
+        """
+        items = list(items)
+        dropped = []
+        with self._lock:
+            if self._closed:
+                self._rejected += len(items)
+                raise QueueClosed("ingest queue is closed")
+            if not force and self.capacity is not None:
+                if len(items) > self.capacity:
+                    self._rejected += len(items)
+                    raise QueueFull(f"{len(items)} items exceed the queue capacity of {self.capacity}")
+                if self.policy == BLOCK:
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._items) + len(items) > self.capacity and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._not_full.wait(remaining)
+                    if self._closed:
+                        self._rejected += len(items)
+                        raise QueueClosed("ingest queue is closed")
+                overflow = len(self._items) + len(items) - self.capacity
+                if overflow > 0:
+                    if self.policy != DROP_OLDEST:
+                        self._rejected += len(items)
+                        raise QueueFull(f"ingest queue is full ({self.capacity} messages)")
+                    dropped = [self._items.popleft() for _ in range(overflow)]
+                    self._dropped += overflow
+            self._items.extend(items)
+            self._accepted += len(items)
+            self._high_water = max(self._high_water, len(self._items))
+            self._not_empty.notify(len(items))
+        if self.on_drop is not None:
+            for item in dropped:
+                self.on_drop(item)
+        return dropped
+
+    # ---------- Consumer side ----------
+    def get_batch(self, max_items):
+        """Wait for at least one item and take up to max_items; [] once closed and empty."""
+        with self._lock:
+            while not self._items:
+                if self._closed:
+                    return []
+                self._not_empty.wait()
+            batch = [self._items.popleft() for _ in range(min(max_items, len(self._items)))]
+            self._not_full.notify_all()
+            if not self._items:
+                self._emptied.notify_all()
+            return batch
+
+    # ---------- Shutdown ----------
+    def close(self):
+        """Refuse new items and wake every waiting producer and consumer."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def drain(self, timeout=None):
+        """Wait until consumers have taken every queued item; True if the queue emptied in time."""
+        with self._lock:
+            return self._emptied.wait_for(lambda: not self._items, timeout)
+
+    # ---------- Statistics ----------
+    def stats(self):
+        with self._lock:
+            return IngestStats(
+                len(self._items), self.capacity, self._high_water, self._accepted, self._rejected, self._dropped
+            )
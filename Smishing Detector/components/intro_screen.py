@@ -4,12 +4,22 @@ import itertools
 
 
 class IntroScreen:
-    def __init__(self, master, duration=3000):
+    def __init__(self, master, duration=3000, progress_source=None, min_duration=300):
         """
         Police-style intro screen (blue-red flashing shield, smoother & slower)
+
+        With a progress_source (callable returning (progress 0..1, status, finished),
+        e.g. BackgroundLoader.snapshot) the bar follows real loading and the splash
+        fades out as soon as loading finishes, staying at least min_duration ms
+        after fading in.
+        Without one it runs for a fixed `duration`.
         """
         self.master = master
         self.duration = duration
+        self.progress_source = progress_source
+        self.min_duration = min_duration
+        self.status_text = "Starting"
+        self.shown_ms = 0
 
         # === Splash window ===
         self.root = ctk.CTkToplevel(master)
@@ -86,7 +96,7 @@ class IntroScreen:
         self.footer_label.pack(side="bottom", pady=(0, 25))
 
         # Animations
-        self.loading_states = itertools.cycle(["Starting.", "Starting..", "Starting..."])
+        self.loading_dots = itertools.cycle([".", "..", "..."])
         self.light_colors = itertools.cycle(["#1e88e5", "#ff1744"])  # blue/red alternating
 
     # ----- Helpers -----
@@ -113,9 +123,19 @@ class IntroScreen:
             self.alpha += 0.03
             self.root.attributes("-alpha", self.alpha)
             self.root.after(20, self._fade_in)
+        elif self.progress_source is not None:
+            self._wait_for_loading()
         else:
             self.root.after(self.duration, self._fade_out)
 
+    def _wait_for_loading(self):
+        _, _, finished = self.progress_source()
+        if finished and self.shown_ms >= self.min_duration:
+            self._fade_out()
+        else:
+            self.shown_ms += 50
+            self.root.after(50, self._wait_for_loading)
+
     def _fade_out(self):
         if self.alpha > 0.0:
             self.alpha -= 0.03
@@ -125,11 +145,16 @@ class IntroScreen:
             self._close()
 
     def _animate_loading(self):
-        self.loading_label.configure(text=next(self.loading_states))
+        self.loading_label.configure(text=self.status_text + next(self.loading_dots))
         self.root.after(350, self._animate_loading)
 
     def _update_progress(self):
-        if self.progress_value < 100:
+        if self.progress_source is not None:
+            progress, self.status_text, finished = self.progress_source()
+            self.progress.set(progress)
+            if not finished:
+                self.root.after(50, self._update_progress)
+        elif self.progress_value < 100:
             self.progress_value += 1
             self.progress.set(self.progress_value / 100)
             self.root.after(self.duration // 100, self._update_progress)
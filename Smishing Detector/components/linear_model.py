@@ -0,0 +1,72 @@
+# linear_model.py
+"""
+Primal form of the trained linear SVC.
+
+SVC(kernel='linear') stores its support vectors, and every predict evaluates
+the kernel against all of them for each one-vs-one pair. For a linear kernel
+each pair's decision function collapses to one weight vector and an
+intercept, so predicting is a sparse-dense dot product plus libsvm's vote.
+"""
+from itertools import combinations
+
+import numpy as np
+
+
+class LinearSVCScorer:
+    """Drop-in replacement for a fitted linear SVC's predict()/decision_function()."""
+
+    def __init__(self, weights, intercepts, classes):
+        self.classes_ = np.asarray(classes)
+        n_classes = len(self.classes_)
+        self.pairs = np.array(list(combinations(range(n_classes), 2)), dtype=np.intp)
+        # (n_features, n_pairs), C-contiguous, so X @ weights is one CSR mat-vec per row
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.intercepts = np.asarray(intercepts, dtype=np.float64)
+        if self.weights.shape[1] != len(self.pairs) or self.intercepts.shape != (len(self.pairs),):
+            raise ValueError("weights/intercepts do not match the number of one-vs-one pairs")
+
+    @classmethod
+    def from_svc(cls, svc):
+        """Collapse a fitted SVC(kernel='linear') into per-pair weight vectors."""
+        if getattr(svc, "kernel", None) != "linear":
+            raise ValueError(f"Only linear SVC models can be converted, got kernel={getattr(svc, 'kernel', None)!r}")
+        coef = svc.coef_
+        if hasattr(coef, "toarray"):
+            coef = coef.toarray()
+        return cls(coef.T, svc.intercept_, svc.classes_)
+
+    @property
+    def n_features_in_(self):
+        return self.weights.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.weights.nbytes + self.intercepts.nbytes
+
+    def decision_function(self, X):
+        """One-vs-one decision values, shape (n_samples, n_pairs), same as SVC with shape='ovo'."""
+        return np.asarray(X @ self.weights) + self.intercepts
+
+    def votes(self, decisions):
+        """libsvm voting: a positive decision for pair (i, j) is a vote for i, otherwise for j."""
+        decisions = np.atleast_2d(decisions)
+        positive = decisions > 0
+        votes = np.zeros((decisions.shape[0], len(self.classes_)), dtype=np.intp)
+        for p, (i, j) in enumerate(self.pairs):
+            votes[:, i] += positive[:, p]
+            votes[:, j] += ~positive[:, p]
+        return votes
+
+    def predict(self, X):
+        # argmax keeps the first class on ties, like libsvm
+        return self.classes_[self.votes(self.decision_function(X)).argmax(axis=1)]
+
+
+def to_linear_scorer(model):
+    """Convert a linear SVC to LinearSVCScorer; other models are returned unchanged."""
+    if isinstance(model, LinearSVCScorer):
+        return model
+    try:
+        return LinearSVCScorer.from_svc(model)
+    except (AttributeError, ValueError):
+        return model
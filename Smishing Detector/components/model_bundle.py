@@ -0,0 +1,243 @@
+# model_bundle.py
+"""
+Single-file, memory-mappable model bundle (model/sms_model.bundle).
+
+Replaces loading two pickles (sms_model.joblib + tfidf_vectorizer.joblib)
+at startup. Layout:
+
+    8 bytes   magic b"SMSBNDL\\0"
+    4 bytes   little-endian uint32: length of the JSON header
+    n bytes   JSON header: format version, model version, preprocessing
+              version, label names, vectorizer settings, hashes of the
+              joblib files it was exported from and, per array, its
+              offset (from the data section), dtype and shape
+    ...       data section, starting at the next 64-byte boundary: raw
+              arrays, each aligned to 64 bytes
+
+Arrays: scorer weights (n_features, n_pairs), intercepts, classes, idf,
+and the vocabulary as one UTF-8 blob of terms in feature-id order, an
+offsets array and a hash table of feature ids (see vocabulary.py; format
+version 1 bundles have no table and get one built at load). Models trained
+with the indicator layout list the indicator names in the header; their
+weights have a row per term and then one per indicator. Loading reads
+only the header and maps the rest read-only, so the OS pages in what
+predictions actually touch.
+"""
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from components.fused_scorer import FusedTfidfScorer
+from components.linear_model import LinearSVCScorer, to_linear_scorer
+from components.preprocess import INDICATOR_NAMES, PREPROCESS_VERSION
+from components.vocabulary import CompactVocabulary, build_slots, encode_terms
+
+BUNDLE_MAGIC = b"SMSBNDL\0"
+BUNDLE_FORMAT_VERSION = 2
+SUPPORTED_FORMAT_VERSIONS = (1, 2)
+ALIGNMENT = 64
+_HEADER_SIZE = struct.Struct("<I")
+
+
+class BundleError(ValueError):
+    """The file is not a bundle this version of the app can use."""
+
+
+class ModelBundle:
+    """A loaded bundle: metadata plus a LinearSVCScorer/FusedTfidfScorer on mapped arrays."""
+
+    def __init__(self, path, header, arrays):
+        self.path = path
+        self.header = header
+        self.arrays = arrays
+        self.labels = list(header["labels"])
+        self.model_version = header["model_version"]
+        self.preprocess_version = header["preprocess_version"]
+
+        self.scorer = LinearSVCScorer(arrays["weights"], arrays["intercepts"], arrays["classes"])
+        vectorizer = header["vectorizer"]
+        self.fused_scorer = FusedTfidfScorer(
+            CompactVocabulary(arrays["terms"], arrays["term_offsets"], arrays["vocab_slots"]),
+            arrays["idf"],
+            self.scorer,
+            token_pattern=vectorizer["token_pattern"],
+            ngram_range=tuple(vectorizer["ngram_range"]),
+            lowercase=vectorizer["lowercase"],
+            n_indicators=len(vectorizer.get("indicators", ())),
+        )
+
+    @property
+    def n_features(self):
+        return self.fused_scorer.n_features
+
+    def __repr__(self):
+        return f"<ModelBundle {self.model_version} labels={self.labels} features={self.n_features}>"
+
+
+def write_bundle(path, fused_scorer, labels, model_version=None, preprocess_version=PREPROCESS_VERSION,
+                 source=None):
+    """
+    Write a FusedTfidfScorer and its label names as a bundle.
+
+    model_version defaults to a hash of the arrays. source ({file name: hash},
+    see file_digests) records what the bundle was exported from. The file is
+    written next to `path` and renamed into place, so readers never see a
+    partial bundle.
+    """
+    scorer = fused_scorer.scorer
+    if len(labels) != len(scorer.classes_):
+        raise BundleError(f"{len(labels)} label names for {len(scorer.classes_)} classes")
+    vocabulary = fused_scorer.vocabulary
+    if isinstance(vocabulary, CompactVocabulary):
+        terms, term_offsets, vocab_slots = vocabulary.arrays
+    else:
+        terms, term_offsets = encode_terms(vocabulary)
+        vocab_slots = build_slots(terms, term_offsets)
+    arrays = {
+        "weights": scorer.weights,
+        "intercepts": scorer.intercepts,
+        "classes": scorer.classes_,
+        "idf": fused_scorer.idf,
+        "terms": terms,
+        "term_offsets": term_offsets,
+        "vocab_slots": vocab_slots,
+    }
+    if model_version is None:
+        digest = hashlib.blake2b(digest_size=6)
+        for array in arrays.values():
+            digest.update(np.ascontiguousarray(array).tobytes())
+        model_version = digest.hexdigest()
+
+    header = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "model_version": model_version,
+        "preprocess_version": preprocess_version,
+        "labels": list(labels),
+        "vectorizer": {
+            "token_pattern": fused_scorer.token_re.pattern,
+            "ngram_range": [fused_scorer.min_n, fused_scorer.max_n],
+            "lowercase": fused_scorer.lowercase,
+            "indicators": list(INDICATOR_NAMES) if fused_scorer.n_indicators else [],
+        },
+        "source": dict(source or {}),
+        "arrays": {},
+    }
+    offset = 0
+    for name, array in arrays.items():
+        offset += -offset % ALIGNMENT
+        header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(_HEADER_SIZE.pack(len(header_bytes)))
+        f.write(header_bytes)
+        data_start = _data_start(len(header_bytes))
+        for name, array in arrays.items():
+            f.write(b"\0" * (data_start + header["arrays"][name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return model_version
+
+
+def _data_start(header_length):
+    prefix = len(BUNDLE_MAGIC) + _HEADER_SIZE.size + header_length
+    return prefix + (-prefix % ALIGNMENT)
+
+
+def read_bundle_header(path):
+    """The JSON header of a bundle, without mapping any arrays."""
+    with open(path, "rb") as f:
+        magic = f.read(len(BUNDLE_MAGIC))
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f"{path} is not a model bundle")
+        (length,) = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("format_version") not in SUPPORTED_FORMAT_VERSIONS:
+        raise BundleError(f"Unsupported bundle format version {header.get('format_version')!r}")
+    header["data_start"] = _data_start(length)
+    return header
+
+
+def load_bundle(path, check_preprocess=True, mmap=True):
+    """
+    Map a bundle read-only and return a ModelBundle.
+
+    With mmap=False the file is read into memory instead, which leaves it
+    free to be replaced while the model is in use (Windows cannot replace a
+    mapped file). Raises BundleError when the file is malformed or was built
+    for another preprocessing version (its features would not match clean_text).
+    """
+    header = read_bundle_header(path)
+    if check_preprocess and header["preprocess_version"] != PREPROCESS_VERSION:
+        raise BundleError(
+            f"Bundle was built with preprocessing version {header['preprocess_version']}, "
+            f"this app uses {PREPROCESS_VERSION}"
+        )
+
+    indicators = header["vectorizer"].get("indicators", [])
+    if indicators and indicators != list(INDICATOR_NAMES):
+        raise BundleError("Bundle was built with different indicator features than this app produces")
+
+    data = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        start = header["data_start"] + spec["offset"]
+        end = start + count * dtype.itemsize
+        if end > len(data):
+            raise BundleError(f"Array {name!r} runs past the end of {path}")
+        arrays[name] = data[start:end].view(dtype).reshape(shape)
+
+    n_terms = len(arrays["idf"])
+    if arrays["weights"].shape[0] != n_terms + len(indicators) or len(arrays["term_offsets"]) != n_terms + 1:
+        raise BundleError("Bundle arrays do not describe the same vocabulary")
+    if "vocab_slots" not in arrays:
+        arrays["vocab_slots"] = build_slots(arrays["terms"], arrays["term_offsets"])
+    try:
+        return ModelBundle(path, header, arrays)
+    except (KeyError, ValueError) as e:
+        raise BundleError(f"Invalid bundle {path}: {e}") from e
+
+
+def file_digests(*paths):
+    """{file name: content hash} for the files that exist among paths."""
+    digests = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                digests[os.path.basename(path)] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            pass
+    return digests
+
+
+def bundle_is_stale(bundle_path, *source_paths):
+    """
+    True when a source file differs from the one the bundle was exported from.
+
+    E.g. a retrained sms_model.joblib copied over the old one: the bundle
+    still holds the old model. Bundles that recorded no sources are never stale.
+    """
+    recorded = read_bundle_header(bundle_path).get("source") or {}
+    current = file_digests(*source_paths)
+    return any(recorded.get(name, digest) != digest for name, digest in current.items())
+
+
+def export_from_joblib(model_path, vectorizer_path, bundle_path, labels, model_version=None):
+    """Convert the trained sms_model.joblib + tfidf_vectorizer.joblib pair into a bundle."""
+    import joblib
+
+    scorer = to_linear_scorer(joblib.load(model_path))
+    if not isinstance(scorer, LinearSVCScorer):
+        raise BundleError("Only linear SVC models can be bundled")
+    fused_scorer = FusedTfidfScorer.from_vectorizer(joblib.load(vectorizer_path), scorer)
+    return write_bundle(bundle_path, fused_scorer, labels, model_version=model_version,
+                        source=file_digests(model_path, vectorizer_path))
@@ -0,0 +1,48 @@
+import threading
+
+
+class BackgroundLoader:
+    """
+    Runs a list of (status_text, function) loading steps on a daemon thread.
+
+    Nothing here touches Tk: the UI polls snapshot() from the main loop to
+    drive the intro screen, and checks `finished` to know when to continue.
+    """
+
+    def __init__(self, steps, name="Model-Loader-Thread"):
+        self.steps = list(steps)
+        self.status = "Starting"
+        self.progress = 0.0
+        self.error = None
+
+        self._done = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True, name=name)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def snapshot(self):
+        """Return (progress 0..1, status text, finished) for the UI."""
+        return self.progress, self.status, self.finished
+
+    def _run(self):
+        try:
+            for i, (status, func) in enumerate(self.steps):
+                self.status = status
+                func()
+                self.progress = (i + 1) / len(self.steps)
+        except Exception as e:
+            self.error = e
+            self.status = "Loading failed"
+            print(f"WARNING: Background loading failed:\n{e}")
+        finally:
+            self.progress = 1.0
+            self._done.set()
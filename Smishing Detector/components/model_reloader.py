@@ -0,0 +1,178 @@
+# model_reloader.py
+"""
+Hot model reload: a swappable model state plus a file watcher.
+
+All the pieces that must change together (model, vectorizer, labels,
+version, prediction cache, worker processes) live in one ModelState, and
+the app swaps a single reference to it. Predictions acquire the state they
+start with and release it when done, so in-flight work finishes on the old
+version; a retired state releases its resources (e.g. worker processes)
+once its last user is gone.
+"""
+import os
+import threading
+
+
+class ModelState:
+    """One loaded model version. Fields are read-only once the state is published."""
+
+    def __init__(self, model, vectorizer, labels, version=None, fused_scorer=None, cache=None, engine=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.labels = list(labels)
+        self.version = version
+        self.fused_scorer = fused_scorer
+        self.cache = cache
+        self.engine = engine
+
+        self._lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+        self._closed = False
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self._close()
+
+    def retire(self):
+        """Mark as replaced; resources are released once no prediction is using it."""
+        with self._lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self._close()
+
+    def _close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self.engine is not None:
+            self.engine.close()
+        if self.cache is not None:
+            self.cache.clear()
+
+    def __repr__(self):
+        return f"<ModelState {self.version} labels={self.labels}>"
+
+
+class ModelHolder:
+    """The current ModelState; get() and swap() are atomic with respect to each other."""
+
+    def __init__(self, state=None):
+        self._state = state
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self._state
+
+    def acquire(self):
+        """The current state with a use registered on it, or None. Pair with state.release()."""
+        with self._lock:
+            state = self._state
+            return state.acquire() if state is not None else None
+
+    def swap(self, new_state):
+        """Publish new_state; the previous one is retired and returned."""
+        with self._lock:
+            old_state, self._state = self._state, new_state
+        if old_state is not None:
+            old_state.retire()
+        return old_state
+
+
+class ModelReloader:
+    """
+    Reloads the model when its files change on disk or when asked to.
+
+    Runs on a daemon thread. load_fn() must build *and validate* a new
+    ModelState, raising on failure; on success on_loaded(state) is called
+    (from the reloader thread) to swap it in, otherwise on_error(exception)
+    and the current model keeps serving. A change is only acted on once the
+    files have stayed the same for one more check, so a model that is still
+    being copied into place is not loaded half-written.
+    """
+
+    def __init__(self, watch_paths, load_fn, on_loaded, on_error=None, check_interval=2.0):
+        self.watch_paths = tuple(watch_paths)
+        self.load_fn = load_fn
+        self.on_loaded = on_loaded
+        self.on_error = on_error
+        self.check_interval = check_interval
+
+        self._wake = threading.Event()
+        self._reload_requested = False
+        self._running = False
+        self._thread = None
+        self._fingerprint = self._file_fingerprint()
+        self._pending = None
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name="Model-Reloader-Thread")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def request_reload(self):
+        """Reload now, whether or not the files changed (thread-safe)."""
+        self._reload_requested = True
+        self._wake.set()
+
+    # ---------- Watching ----------
+    def _file_fingerprint(self):
+        fingerprint = []
+        for path in self.watch_paths:
+            try:
+                st = os.stat(path)
+                fingerprint.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def _files_settled(self):
+        fingerprint = self._file_fingerprint()
+        if fingerprint == self._fingerprint:
+            self._pending = None
+            return False
+        if fingerprint != self._pending:  # changed since the last check: wait for it to settle
+            self._pending = fingerprint
+            return False
+        return True
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+            if not self._running:
+                return
+            requested, self._reload_requested = self._reload_requested, False
+            if requested or self._files_settled():
+                self._reload()
+
+    def _reload(self):
+        fingerprint = self._file_fingerprint()
+        try:
+            state = self.load_fn()
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
+        else:
+            self.on_loaded(state)
+        # a failed version is not retried until the files change again
+        self._fingerprint = fingerprint
+        self._pending = None
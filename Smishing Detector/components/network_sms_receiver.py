@@ -1,39 +1,136 @@
 import threading
+import selectors
 import socket
 import sys
+import time
 import traceback
 import json
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 from pathlib import Path
-import qrcode
-from PIL import Image, ImageTk
-import tkinter as tk
+
+from components.http_framing import HttpFramingError, HttpRequestParser, build_response, wants_keep_alive
 
 # --- TCP Configuration ---
 HOST = ''          # Listen on all interfaces
 PORT = 65432       # Fixed port
-BUFFER_SIZE = 1024
+BUFFER_SIZE = 16 * 1024  # one reusable recv_into buffer for all connections
+LISTEN_BACKLOG = 128
+# Responses not yet taken by a phone; past this, its requests are not read until it catches up
+MAX_PENDING_OUTPUT = 256 * 1024
+# Per-connection token bucket: sustained requests per second and burst size (429 beyond);
+# a bulk upload is one request
+RATE_LIMIT = 50
+RATE_BURST = 500
+# How long stop_server waits for the server thread to finish its current request
+# (plus the ingest queue's block_timeout, which that request may be waiting out)
+STOP_TIMEOUT = 1.0
+# How long stop_server waits for accepted SMS to leave the ingest queue
+DRAIN_TIMEOUT = 5.0
+# Accepted SMS are reported as one status line per interval, not one per message
+LOG_INTERVAL = 1.0
+
+
+class RequestRejected(Exception):
+    """Raised by sms_callback or batch_callback to refuse; the phone gets `status` (e.g. 503) back."""
+
+    def __init__(self, status, reason, retry_after=None):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Connection:
+    """One connected phone: socket, address, request parser, unsent responses and rate budget."""
+
+    __slots__ = ("sock", "address", "parser", "outbox", "events", "closing", "tokens", "refilled")
+
+    def __init__(self, sock, address, burst):
+        self.sock = sock
+        self.address = address
+        # Requests may span several reads and one read may hold several requests
+        self.parser = HttpRequestParser()
+        self.outbox = bytearray()
+        self.events = selectors.EVENT_READ
+        self.closing = False  # close once the outbox is sent
+        self.tokens = burst
+        self.refilled = time.monotonic()
 
 
 class NetworkSMSReceiver:
     """
-    Manages TCP server creation, QR display, client connection, and data reception.
+    Manages TCP server creation, QR display, client connections, and data reception.
+
+    One server thread serves every phone at once: a selector watches the
+    listening socket, each persistent connection and a wake-up socket pair,
+    and reads whichever is ready. Each connection keeps its own parser, so
+    a slow or half-sent request from one phone never holds up another.
+    stop_server wakes the selector through the socket pair; the server
+    thread then closes every socket itself.
+
+    Every request gets an HTTP/1.1 response on the same connection, in
+    order, and the connection stays open unless the phone asked to close
+    it, so phones can send (and pipeline) SMS without reconnecting:
+
+    - 200 {"status": "accepted", "id": ...}: queued for classification
+      (id is whatever sms_callback returned);
+    - 400 / 413 / 431: not an SMS JSON object, or broken or oversized
+      framing (the connection is then closed);
+    - 405: not a POST;
+    - 411: a POST without Content-Length (or chunked encoding) on a
+      keep-alive connection; the connection is then closed. Without
+      either header a POST is only read on a connection that closes
+      after it;
+    - 429: the connection exceeded rate_limit requests per second
+      (rate_burst at once); Retry-After tells the phone when to resend;
+    - 503 (or any status): sms_callback raised RequestRejected.
+
+    A body may also be a JSON array or newline-delimited JSON of SMS
+    records, e.g. a backlog uploaded by a phone that was offline. All of
+    them go to batch_callback(messages) in one call (to sms_callback one
+    by one if there is none), and the 200 response lists one result per
+    record, in order: {"id": ...}, or {"error": ...} for a record that is
+    not an SMS object (including one whose "message" is not a string). If sms_callback refuses part-way through, the
+    records already handed over keep their ids and the rest get
+    {"error": ...}, so the phone resends only those; if it refuses the
+    first one, nothing was taken and the request gets its status.
+
+    If the callbacks feed a bounded queue (ingest_queue, see
+    components.ingest_queue), they refuse with RequestRejected(503) when it
+    is full, and stop_server waits up to drain_timeout seconds for the SMS
+    already accepted to be taken for classification.
     """
 
-    def __init__(self, root_instance, sms_callback, log_callback):
+    def __init__(self, root_instance, sms_callback, log_callback, callback_on_ui_thread=True,
+                 rate_limit=RATE_LIMIT, rate_burst=RATE_BURST, batch_callback=None,
+                 ingest_queue=None, drain_timeout=DRAIN_TIMEOUT):
         self.root = root_instance
         self.sms_callback = sms_callback
+        self.batch_callback = batch_callback
         self.log_callback = log_callback
+        # False: sms_callback is thread-safe and is called straight from the receiving thread
+        self.callback_on_ui_thread = callback_on_ui_thread
+        self.rate_limit = rate_limit  # None: unlimited
+        self.rate_burst = rate_burst
+        self.ingest_queue = ingest_queue
+        self.drain_timeout = drain_timeout
 
         self.server_socket = None
-        self.client_socket = None
-        self.conn_address = None
+        self.connections = {}  # socket -> _Connection, owned by the server thread
         self.thread = None
+        self._wakeup_recv = None
+        self._wakeup_send = None
+        self._listen_status = "Listening"
+        self._unlogged = 0  # SMS accepted since the last "Received" line (server thread only)
+        self._next_log = 0.0
 
         self.is_running = False
         self.ui_callback = None  # For UI connection status
 
+    @property
+    def client_count(self):
+        return len(self.connections)
+
     # ---------- UI callback ----------
     def set_ui_update_callback(self, callback):
         self.ui_callback = callback
@@ -42,14 +139,22 @@ class NetworkSMSReceiver:
         if self.ui_callback:
             self.root.after(0, self.ui_callback, status)
 
+    def _log_safe(self, message, label):
+        self.root.after(0, self.log_callback, message, label)
+
     # ---------- Start / Stop Server ----------
     def start_server(self, port=PORT):
         """Starts the TCP server thread and QR display."""
         if self.is_running:
             self.log_callback("Server already running.", "Info")
             return
+        if self.thread is not None and self.thread.is_alive():
+            # Its cleanup would close the new server's sockets
+            self.log_callback("The previous server is still shutting down; try again in a moment.", "Error")
+            return
 
         self.is_running = True
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
         self.thread = threading.Thread(
             target=self._run_server_thread, args=(port,), daemon=True, name="TCP-Server-Thread"
         )
@@ -61,34 +166,31 @@ class NetworkSMSReceiver:
             return
 
         self.is_running = False
-
-        # Close client connection
-        if self.client_socket:
-            try:
-                self.client_socket.close()
-            except Exception:
-                pass
-            self.client_socket = None
-            self.conn_address = None
-
-        # Close listening socket
-        if self.server_socket:
-            try:
-                temp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                temp_sock.connect(('127.0.0.1', self.server_socket.getsockname()[1]))
-                temp_sock.close()
-                self.server_socket.close()
-            except Exception:
-                pass
-            self.server_socket = None
+        self._wake()
 
         if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=1)
-        self.thread = None
+            block_timeout = getattr(self.ingest_queue, "block_timeout", 0) or 0
+            self.thread.join(timeout=STOP_TIMEOUT + block_timeout)
+        # Logged through root.after: the app may call this off the Tk thread while it closes
+        if self.thread and self.thread.is_alive():
+            self._log_safe("Network server thread did not stop in time.", "Error")
+        else:
+            self.thread = None
+
+        # Nothing new comes in now; let the SMS already answered with 200 reach the classifier
+        if self.ingest_queue is not None and not self.ingest_queue.drain(self.drain_timeout):
+            self._log_safe(f"{len(self.ingest_queue)} received SMS still waiting for classification.", "Error")
 
-        self.log_callback("Network server stopped.", "Info")
+        self._log_safe("Network server stopped.", "Info")
         self._update_ui_status_safe("Stopped")
 
+    def _wake(self):
+        """Interrupt the server thread's select()."""
+        try:
+            self._wakeup_send.send(b'\0')
+        except (AttributeError, OSError):
+            pass  # already closed by the server thread
+
     # ---------- Helper: Get local IP ----------
     @staticmethod
     def _get_local_ip():
@@ -107,6 +209,8 @@ class NetworkSMSReceiver:
     def _show_qr_popup(self, payload: str):
         """Generates and displays a QR with tcp://IP:PORT."""
         try:
+            import qrcode  # only needed once the server is started
+
             img = qrcode.make(payload)
             qr_path = Path.cwd() / "connection_qr.png"
             img.save(qr_path)
@@ -118,6 +222,7 @@ class NetworkSMSReceiver:
     # ---------- SMS JSON parser ----------
     @staticmethod
     def extract_sms_data(raw_request_data: bytes) -> Optional[Dict[str, str]]:
+        """SMS fields from one complete raw HTTP request."""
         SEPARATOR = b'\r\n\r\n'
         try:
             sep_index = raw_request_data.index(SEPARATOR)
@@ -125,33 +230,94 @@ class NetworkSMSReceiver:
         except ValueError:
             print("Parser Error: Could not find end of HTTP headers.")
             return None
+        return NetworkSMSReceiver.sms_from_body(body_raw)
 
+    @staticmethod
+    def sms_from_body(body_raw: bytes) -> Optional[Dict[str, str]]:
+        """SMS fields from the JSON body of a request."""
         try:
             json_string = body_raw.decode('utf-8').strip()
             sms_data = json.loads(json_string)
         except Exception as e:
             print(f"Parser Error: {e}")
             return None
+        if not isinstance(sms_data, dict):
+            print("Parser Error: SMS JSON is not an object.")
+            return None
+        return NetworkSMSReceiver.sms_from_record(sms_data)
 
+    @staticmethod
+    def sms_records_from_body(body_raw: bytes) -> Tuple[Optional[List[Optional[Dict[str, str]]]], bool]:
+        """
+        (SMS fields per record, is_bulk) for a request body.
+
+        A single JSON object gives one record; a JSON array or NDJSON (one
+        object per line) gives one per element or line, in order, with None
+        for an element that is not an SMS object (see sms_from_record). The records are None if the
+        body is none of these.
+        """
+        try:
+            json_string = body_raw.decode('utf-8').strip()
+        except UnicodeDecodeError as e:
+            print(f"Parser Error: {e}")
+            return None, False
+        try:
+            data = json.loads(json_string)
+        except ValueError as e:
+            lines = [line for line in json_string.splitlines() if line.strip()]
+            if len(lines) < 2:
+                print(f"Parser Error: {e}")
+                return None, False
+            data = []
+            for line in lines:
+                try:
+                    data.append(json.loads(line))
+                except ValueError:
+                    data.append(None)
+            if not any(isinstance(record, dict) for record in data):
+                print(f"Parser Error: {e}")
+                return None, False
+        if isinstance(data, dict):
+            return [NetworkSMSReceiver.sms_from_record(data)], False
+        if isinstance(data, list):
+            return [NetworkSMSReceiver.sms_from_record(record) for record in data], True
+        print("Parser Error: SMS JSON is not an object.")
+        return None, False
+
+    @staticmethod
+    def sms_from_record(sms_data) -> Optional[Dict[str, str]]:
+        """SMS fields from one decoded JSON record; None if it is not an object or its message is not text."""
+        if not isinstance(sms_data, dict):
+            return None
         sms_message = sms_data.get('message', '--- MESSAGE MISSING ---')
+        if not isinstance(sms_message, str):
+            return None  # e.g. a number or null: the classifier only takes text
         sender = sms_data.get('sender', '--- SENDER MISSING ---')
         user = sms_data.get('phoneNumber','--- USER MISSING ---')
         device_name = sms_data.get('deviceName','--- DEVICE MISSING ---')
         timestamp_ms = sms_data.get('timestamp')
         formatted_time = '--- TIME MISSING ---'
         if isinstance(timestamp_ms, (int, float)):
-            dt = datetime.fromtimestamp(timestamp_ms / 1000)
-            formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
+            try:
+                dt = datetime.fromtimestamp(timestamp_ms / 1000)
+                formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
+            except (OverflowError, OSError, ValueError):
+                pass
 
         return {"message": sms_message,"phoneNumber" : user,"deviceName" : device_name, "sender": sender, "time": formatted_time}
 
     # ---------- Main server thread ----------
     def _run_server_thread(self, port):
+        selector = selectors.DefaultSelector()
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((HOST, port))
-            self.server_socket.listen(1)
+            self.server_socket.listen(LISTEN_BACKLOG)
+            self.server_socket.setblocking(False)
+            selector.register(self.server_socket, selectors.EVENT_READ)
+            self._wakeup_recv.setblocking(False)
+            selector.register(self._wakeup_recv, selectors.EVENT_READ)
 
             host_ip = self._get_local_ip()
             server_port = self.server_socket.getsockname()[1]
@@ -160,53 +326,251 @@ class NetworkSMSReceiver:
             # Show QR code popup
             self.root.after(0, self._show_qr_popup, payload)
 
-            self.log_callback(f"Server started on {host_ip}:{server_port}. Waiting for connection...", "Info")
-            self._update_ui_status_safe(f"Listening on {host_ip}:{server_port}")
+            self._log_safe(f"Server started on {host_ip}:{server_port}. Waiting for connections...", "Info")
+            self._listen_status = f"Listening on {host_ip}:{server_port}"
+            self._update_ui_status_safe(self._listen_status)
 
+            buffer = bytearray(BUFFER_SIZE)
+            view = memoryview(buffer)
             while self.is_running:
-                self.client_socket, self.conn_address = self.server_socket.accept()
-                if not self.is_running:
-                    break
-
-                self._update_ui_status_safe(f"Connected: {self.conn_address[0]}")
-                self.log_callback(f"📶 Client connected: {self.conn_address[0]}", "Info")
-                self._receive_data_loop()
+                for key, mask in selector.select(self._log_timeout()):
+                    if key.fileobj is self._wakeup_recv:
+                        self._drain_wakeup()
+                    elif key.fileobj is self.server_socket:
+                        self._accept_clients(selector)
+                    else:
+                        if mask & selectors.EVENT_READ:
+                            self._receive_data(selector, key.data, buffer, view)
+                        if mask & selectors.EVENT_WRITE and key.data.sock in self.connections:
+                            self._flush(selector, key.data)
+                self._log_received()
 
         except Exception as e:
             if self.is_running:
                 tb = traceback.format_exc()
-                self.root.after(0, self.log_callback, f"Server thread error: {e}\n{tb}", "Error")
+                self._log_safe(f"Server thread error: {e}\n{tb}", "Error")
         finally:
+            self._log_received(force=True)
             self.is_running = False
-            self.client_socket = None
-            self.conn_address = None
+            for connection in list(self.connections.values()):
+                self._close_connection(selector, connection, update_status=False)
+            for sock in (self.server_socket, self._wakeup_recv, self._wakeup_send):
+                if sock is not None:
+                    try:
+                        sock.close()
+                    except Exception:
+                        pass
+            selector.close()
+            self.server_socket = None
             self._update_ui_status_safe("Stopped")
 
-    # ---------- Continuous data reception ----------
-    def _receive_data_loop(self):
-        while self.is_running and self.client_socket:
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_recv.recv(64):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _update_connection_status(self):
+        count = len(self.connections)
+        if count:
+            self._update_ui_status_safe(f"Connected: {count} phone{'s' if count > 1 else ''}")
+        else:
+            self._update_ui_status_safe(self._listen_status)
+
+    # ---------- Connections ----------
+    def _accept_clients(self, selector):
+        """Accept every pending connection."""
+        while True:
             try:
-                data = self.client_socket.recv(BUFFER_SIZE)
-                if not data:
-                    self.log_callback(f"Client {self.conn_address[0]} disconnected.", "Info")
-                    break
-                message = NetworkSMSReceiver.extract_sms_data(data)
-                if message:
-                    self.root.after(0, self.log_callback, f"Received {len(message)} chars.", "Info")
-                    self.root.after(0, self.sms_callback, message)
-
-            except ConnectionResetError:
-                self.log_callback(f"Client {self.conn_address[0]} forcibly closed connection.", "Error")
+                sock, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                self._log_safe(f"Accept failed: {e}", "Error")
                 break
-            except Exception as e:
-                self.log_callback(f"Data reception error: {e}", "Error")
+            sock.setblocking(False)
+            connection = _Connection(sock, address, self.rate_burst)
+            self.connections[sock] = connection
+            selector.register(sock, selectors.EVENT_READ, connection)
+            self._log_safe(f"📶 Client connected: {address[0]}", "Info")
+        self._update_connection_status()
+
+    def _close_connection(self, selector, connection, update_status=True):
+        self.connections.pop(connection.sock, None)
+        try:
+            selector.unregister(connection.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            connection.sock.close()
+        except Exception:
+            pass
+        if update_status:
+            self._update_connection_status()
+
+    # ---------- Data reception ----------
+    def _receive_data(self, selector, connection, buffer, view):
+        """Read what one ready connection sent and answer every complete request."""
+        address = connection.address[0]
+        try:
+            received = connection.sock.recv_into(buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionResetError:
+            self._log_safe(f"Client {address} forcibly closed connection.", "Error")
+            self._close_connection(selector, connection)
+            return
+        except OSError as e:
+            self._log_safe(f"Data reception error: {e}", "Error")
+            self._close_connection(selector, connection)
+            return
+
+        if not received:
+            if connection.parser.pending:
+                self._log_safe(
+                    f"Client {address} disconnected mid-request ({connection.parser.pending} bytes dropped).",
+                    "Error"
+                )
+            else:
+                self._log_safe(f"Client {address} disconnected.", "Info")
+            # Responses still queued are sent before closing, in case the phone only half-closed
+            connection.closing = True
+            self._flush(selector, connection)
+            return
+
+        error = None
+        try:
+            requests = connection.parser.feed(view[:received])
+        except HttpFramingError as e:
+            requests, error = e.requests, e
+
+        for request in requests:
+            if connection.closing:
                 break
+            connection.outbox += self._respond(connection, request)
+        if error is not None and not connection.closing:
+            self._log_safe(f"Malformed request from {address}, closing: {error}", "Error")
+            connection.outbox += build_response(error.status, {"error": str(error)}, keep_alive=False)
+            connection.closing = True
+        self._flush(selector, connection)
+
+    def _respond(self, connection, request):
+        """Hand one request's SMS over and return the response for it."""
+        keep_alive = wants_keep_alive(request)
+        connection.closing = not keep_alive
+        headers = None
+        if request.method != 'POST':
+            status, payload, headers = 405, {"error": "SMS must be sent with POST"}, {"Allow": "POST"}
+        elif not self._take_token(connection):
+            status, payload = 429, {"error": "too many messages on this connection"}
+            headers = {"Retry-After": max(1, round(1 / self.rate_limit))}
+        else:
+            records, bulk = NetworkSMSReceiver.sms_records_from_body(request.body)
+            if records is None or not (bulk or records[0]):
+                status, payload = 400, {"error": "body is not an SMS JSON object, array or NDJSON"}
+            else:
+                try:
+                    if bulk:
+                        status, payload = 200, self._deliver_bulk(records)
+                        self._unlogged += payload["accepted"]
+                    else:
+                        status, payload = 200, {"status": "accepted", "id": self._deliver(records[0])}
+                        self._unlogged += 1
+                except RequestRejected as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if e.retry_after is not None:
+                        headers = {"Retry-After": e.retry_after}
+        return build_response(status, payload, keep_alive, headers)
+
+    def _deliver_bulk(self, records):
+        """Hand the valid records over together; the response payload with one result per record."""
+        messages = [record for record in records if record is not None]
+        refused = None
+        if self.batch_callback is None:
+            ids = []
+            for message in messages:
+                try:
+                    ids.append(self._deliver(message))
+                except RequestRejected as e:
+                    if not ids:
+                        raise  # nothing taken: refuse the whole upload
+                    refused = {"error": str(e)}
+                    break
+            taken = len(ids)
+        else:
+            if self.callback_on_ui_thread:
+                self.root.after(0, self.batch_callback, messages)
+                ids = []
+            else:
+                ids = list(self.batch_callback(messages))
+            taken = len(messages)
+
+        results = []
+        index = 0  # among the valid records
+        for record in records:
+            if record is None:
+                results.append({"error": "not an SMS object"})
+            elif index < taken:
+                results.append({"id": ids[index] if index < len(ids) else None})
+                index += 1
+            else:
+                results.append(refused)
+        return {"status": "accepted", "accepted": taken, "results": results}
+
+    def _deliver(self, message):
+        if self.callback_on_ui_thread:
+            self.root.after(0, self.sms_callback, message)
+            return None
+        return self.sms_callback(message)
 
-        if self.client_socket:
+    def _log_timeout(self):
+        """How long select() may wait before the pending "Received" line is due; None: nothing pending."""
+        if not self._unlogged:
+            return None
+        return max(0.0, self._next_log - time.monotonic())
+
+    def _log_received(self, force=False):
+        """One status line for the SMS accepted since the last one, at most once per LOG_INTERVAL."""
+        now = time.monotonic()
+        if self._unlogged and (force or now >= self._next_log):
+            self._log_safe(f"Received {self._unlogged} SMS.", "Info")
+            self._unlogged = 0
+            self._next_log = now + LOG_INTERVAL
+
+    def _take_token(self, connection):
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        connection.tokens = min(self.rate_burst, connection.tokens + (now - connection.refilled) * self.rate_limit)
+        connection.refilled = now
+        if connection.tokens < 1:
+            return False
+        connection.tokens -= 1
+        return True
+
+    # ---------- Responses ----------
+    def _flush(self, selector, connection):
+        """Send what the socket takes now; watch for writability while responses remain."""
+        if connection.outbox:
             try:
-                self.client_socket.close()
-            except Exception:
-                pass
-        self.client_socket = None
-        self.conn_address = None
-        self._update_ui_status_safe("Listening")
+                sent = connection.sock.send(connection.outbox)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._close_connection(selector, connection)
+                return
+            del connection.outbox[:sent]
+
+        if not connection.outbox:
+            if connection.closing:
+                self._close_connection(selector, connection)
+                return
+            events = selectors.EVENT_READ
+        elif connection.closing or len(connection.outbox) > MAX_PENDING_OUTPUT:
+            events = selectors.EVENT_WRITE
+        else:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        if events != connection.events:
+            selector.modify(connection.sock, events, connection)
+            connection.events = events
@@ -0,0 +1,101 @@
+# prediction_cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+# Fixed per-entry overhead (key, tuple, OrderedDict node) added to the payload size.
+ENTRY_OVERHEAD = 256
+
+CachedPrediction = namedtuple("CachedPrediction", ["text_clean", "label_idx", "scores", "size"])
+
+
+class PredictionCache:
+    """
+    LRU cache of cleaned text, decision scores and label, keyed by a hash of the raw SMS.
+
+    Bounded both by entry count and by an estimate of the memory held. Each
+    cache belongs to one loaded model: a reload swaps in a fresh cache together
+    with the new model (see model_reloader.ModelState).
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ---------- Keys & sizes ----------
+    @staticmethod
+    def key_for(message):
+        return hashlib.blake2b(message.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    @staticmethod
+    def _entry_size(text_clean, scores):
+        size = ENTRY_OVERHEAD + sys.getsizeof(text_clean)
+        if scores is not None:
+            size += scores.nbytes
+        return size
+
+    # ---------- Invalidation ----------
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    # ---------- Lookup / insert ----------
+    def get(self, message):
+        if not isinstance(message, str):
+            return None
+        key = self.key_for(message)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, message, text_clean, label_idx, scores=None):
+        if not isinstance(message, str):
+            return
+        size = self._entry_size(text_clean, scores)
+        if size > self.max_bytes:
+            return
+        key = self.key_for(message)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = CachedPrediction(text_clean, label_idx, scores, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,85 +1,345 @@
 import re
 import string
+import threading
 import unicodedata
-import spacy
-from nltk.corpus import stopwords 
-
-# --- GEREKLİ NLTK KAYNAKLARI ---
-try:
-    english_stopwords = set(stopwords.words('english'))
-except LookupError:
-    import nltk
-    nltk.download('stopwords')
-    english_stopwords = set(stopwords.words('english'))
-
-# --- spaCy Modelini Yükleme ---
-try:
-    nlp = spacy.load("en_core_web_sm", disable=["parser", "ner", "textcat"])
-except OSError:
-    print("[HATA] Lütfen komut satırında 'python -m spacy download en_core_web_sm' komutunu çalıştırın.")
-    raise
+from collections import deque
+from itertools import repeat
+from components.feature_extraction import ENTITY_KINDS, scan_entities
 
-# --- PREPROCESSING FUNCTION ---
-def clean_text(text: str) -> str:
+# Ön işleme sürümü: clean_text çıktısını değiştiren her düzenlemede artırılır.
+# Model paketi (model/sms_model.bundle) hangi sürümle eğitildiğini saklar.
+PREPROCESS_VERSION = 1
+
+# --- LEMMATIZER ---
+# spaCy + NLTK import sırasında değil, ilk kullanımda (veya warm_up ile arka
+# planda) bir kez yüklenir.
+_load_lock = threading.RLock()
+nlp = None
+english_stopwords = None
+
+def load_spacy():
+    """Load en_core_web_sm and the NLTK stop words once; returns (nlp, english_stopwords)."""
+    with _load_lock:
+        return _load_spacy_locked()
+
+def _load_spacy_locked():
+    global nlp, english_stopwords
+    if nlp is not None:
+        return nlp, english_stopwords
+
+    import spacy
+    from nltk.corpus import stopwords
+
+    # --- GEREKLİ NLTK KAYNAKLARI ---
+    try:
+        words = set(stopwords.words('english'))
+    except LookupError:
+        import nltk
+        nltk.download('stopwords')
+        words = set(stopwords.words('english'))
+
+    # --- spaCy Modelini Yükleme ---
+    try:
+        model = spacy.load("en_core_web_sm", disable=["parser", "ner", "textcat"])
+    except OSError:
+        print("[HATA] Lütfen komut satırında 'python -m spacy download en_core_web_sm' komutunu çalıştırın.")
+        raise
+
+    english_stopwords = words
+    nlp = model
+    return nlp, english_stopwords
+
+def warm_up():
+    """Load spaCy and the stop words, so the first message is not cold."""
+    load_spacy()
+
+def _kept_lemmas(doc, stopwords):
+    return [token.lemma_ for token in doc if token.lemma_ not in stopwords and len(token.lemma_) > 1]
+
+def lemmatize(text: str) -> list:
+    """Lemmas of normalized text from the spaCy pipeline, stop words removed."""
+    model, stopwords = load_spacy()
+    return _kept_lemmas(model(text), stopwords)
+
+# --- ŞÜPHELİ ANAHTAR KELİMELER ---
+SUSPICIOUS_KEYWORDS = (
+    "account", "password", "verify", "login", "update", "confirm", "reward", "won", "bank", "security", "id", "delivery", "payment", "suspend", "locked", "urgent",
+    "click", "link", "free", "immediate", "now", "alert", "warning", "change", "win", "prize", "billing", "invoice", "card", "credit", "action required", "respond",
+    "claim", "suspicious", "fraud", "limited time", "expires", "personal", "confidential", "unauthorized", "access", "reset", "secure", "transaction", "balance", "due",
+    "overdue", "pending", "failed", "declined", "package", "tracking", "shipment", "offer", "deal", "discount", "gift", "voucher", "coupon", "exclusive",
+    "verify your identity", "update your information", "account verification", "login attempt", "security breach", "unusual activity", "contact us", "call now",
+    "text back", "reply", "subscription", "membership", "trial", "expiration", "renew", "funds", "transfer", "deposit", "withdrawal", "review", "confirm payment",
+    "validate", "authentication", "pin", "code", "OTP", "urgent action", "last chance", "time-sensitive", "act now", "don’t miss", "failure to respond",
+    "account closure", "verify now", "click here", "short link", "download", "install", "app", "survey", "bonus", "cash", "lottery", "sweepstakes", "charity",
+    "donation", "tax", "refund", "government", "IRS", "legal", "lawsuit", "warrant", "arrest", "debt", "collection", "pay now", "secure link",
+    "personal information", "SSN", "account number", "bank details", "password reset", "urgent update", "limited offer", "exclusive offer", "contact immediately"
+)
+
+def _trie_pattern(words):
+    """Render words as a prefix-trie regex; at any position it matches the longest word starting there."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return render(trie)
+
+def _build_keyword_matcher(keywords):
+    """
+    Compile all keywords into one automaton-like regex, built once at import.
+
+    The trie is wrapped in a lookahead, so a single finditer pass reports the longest
+    keyword starting at every position, overlaps included. Shorter keywords inside a
+    reported one ("account" in "account number", "now" in "act now") come from a
+    precomputed containment table; together this is equivalent to `word in text`
+    for every keyword.
+    """
+    pattern = re.compile('(?=(' + _trie_pattern(set(keywords)) + '))')
+    contained = {
+        word: tuple(i for i, other in enumerate(keywords) if other in word)
+        for word in set(keywords)
+    }
+    tags = tuple(f" <ALERT_{word.upper()}> " for word in keywords)
+    return pattern, contained, tags
+
+_KEYWORD_PATTERN, _KEYWORD_CONTAINED, _KEYWORD_TAGS = _build_keyword_matcher(SUSPICIOUS_KEYWORDS)
+
+def suspicious_keyword_ids(text: str) -> set:
+    """Indices (into SUSPICIOUS_KEYWORDS) of every suspicious keyword in text."""
+    found = set()
+    for match in _KEYWORD_PATTERN.finditer(text):
+        found.update(_KEYWORD_CONTAINED[match.group(1)])
+    return found
+
+def tag_suspicious_keywords(text: str) -> str:
+    """Return the alert tags for every suspicious keyword in text, in SUSPICIOUS_KEYWORDS order."""
+    found = suspicious_keyword_ids(text)
+    if not found:
+        return ""
+    return ''.join(_KEYWORD_TAGS[i] for i in sorted(found))
+
+# --- NORMALİZASYON DESENLERİ (import sırasında bir kez derlenir) ---
+# Non-ASCII artıkları boşluğa çevrilir. HTML etiketleri (<...>, satır sonu
+# içermeyen) önce strip_tags ile silinir: '<[^>\n]*>' deseni kapanmayan her
+# '<' için satır sonuna kadar tarar ve "<<<<..." girdisinde karesel süre alır.
+_JUNK_RE = re.compile(r'[^a-zA-Z0-9\s<>$]+')
+_MULTISPACE_RE = re.compile(r'\s\s+')
+_REPEAT_RE = re.compile(r'(.)\1{2,}')
+# URL / PHONE / MONEY / NUM anonimleştirmesi tek geçişte yapılır. Alternatiflerin
+# sırası eski ardışık re.sub çağrılarının önceliğini korur.
+# Bu geçiş scan_entities sonuçlarını kullanmaz: normalize edilmiş metin üzerinde
+# çalışır ("http://bit.ly" burada "http bit ly" olmuştur) ve etiketli düzende
+# eğitilmiş model bu çıktıya bayt bayt bağlıdır. scan_entities yayılımlarıyla
+# derlemin %18'inde (1296/7033 mesaj) farklı yer tutucular çıkar; yeniden eğitim
+# gerekir. Tek tarama yalnızca "indicators" düzeninde geçerlidir
+# (normalize_text_indicators).
+_ENTITY_RE = re.compile(
+    r'(?P<URL>http\S+|www\S+)'
+    r'|(?P<PHONE>\+?\d[\d\s\-\(\)]{4,}\d)'
+    r'|(?P<MONEY>\d+\s*(?:usd|eur|\$|tl))'
+    r'|(?P<NUM>\d+)'
+)
+_ENTITY_TOKENS = {name: f' <{name}> ' for name in _ENTITY_RE.groupindex}
+
+# --- GÖSTERGE ÖZELLİKLERİ ---
+# "indicators" düzeninde anahtar kelime etiketleri ve varlık yer tutucuları metne
+# yazılmaz; TF-IDF matrisinin yanına ayrı, seyrek bir blok olarak eklenir
+# (FusedTfidfScorer n_indicators). Sütun sırası bu listedir.
+ENTITY_INDICATORS = ENTITY_KINDS
+INDICATOR_NAMES = tuple(f"ALERT_{word.upper()}" for word in SUSPICIOUS_KEYWORDS) + ENTITY_INDICATORS
+_ENTITY_INDICATOR_IDS = {name: len(SUSPICIOUS_KEYWORDS) + i for i, name in enumerate(ENTITY_INDICATORS)}
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation.replace("'", ""))
+
+# --- GİRDİ BOYUTU SINIRI ---
+# Ağdan gelen mesajlar sınıflandırmadan önce bu uzunluğa kısaltılır
+# (truncate_message; user_settings.json: "max_message_length", 0 = sınırsız).
+# Uzun birleştirilmiş SMS'ler bile birkaç yüz karakterdir; sınır, tek bir dev
+# mesajın ön işleme ve taramada işçileri meşgul etmesini önler.
+MAX_MESSAGE_LENGTH = 2000
+
+def strip_tags(text: str) -> str:
+    """
+    Replace every '<...>' tag (no newline inside) with a space, in linear time.
+
+    Same result as re.sub(r'<[^>\\n]*>', ' ', text): a tag runs from a '<' to
+    the first '>' after it. If a newline comes first, no '<' before that
+    newline can start a tag, so the search resumes after it instead of
+    rescanning the line from every '<'.
+    """
+    pieces = []
+    position = 0
+    newline = -1
+    start = text.find('<')
+    while start != -1:
+        if newline < start:
+            newline = text.find('\n', start)
+            if newline == -1:
+                newline = len(text)
+        end = text.find('>', start + 1, newline)
+        if end == -1:
+            start = text.find('<', newline + 1)
+            continue
+        pieces.append(text[position:start])
+        pieces.append(' ')
+        position = end + 1
+        start = text.find('<', position)
+    if not pieces:
+        return text
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+def truncate_message(text: str, max_length=MAX_MESSAGE_LENGTH) -> str:
+    """
+    text limited to max_length characters for classification (0/None: no limit).
+
+    Keeps the first three quarters and the last quarter of the budget, joined
+    by a space: the hook of a smishing SMS is usually at the start and its
+    link or phone number at the end, and the space keeps the two pieces from
+    merging into one word.
+    """
+    if not max_length or not isinstance(text, str) or len(text) <= max_length:
+        return text
+    tail = max_length // 4
+    head = max(max_length - tail - 1, 0)
+    return text[:head] + ' ' + text[len(text) - tail:]
+
+def _entity_token(match):
+    return _ENTITY_TOKENS[match.lastgroup]
+
+def normalize_text(text: str) -> str:
+    """
+    Everything clean_text does before lemmatization, in a fixed number of passes.
+
+    Output is identical to the original step-by-step version. Steps that could no
+    longer fire were dropped: after the ASCII/junk pass no '!', '?', '@', '.', '£'
+    or '₺' is left, so the punctuation-repeat, EMAIL and DOMAIN substitutions never
+    matched.
+    """
     if not isinstance(text, str):
         return ""
     text = text.lower()
 
-    # 2. Unicode Normalizasyonu ve Aksan Giderme (De-accenting)
-    try:
-        text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('utf-8')
-    except:
-        pass
-
-    # 3. YENİ EKLEME: Non-ASCII ve HTML Karakterlerini Temizleme
-    # Amacı: SMS'lerde kalabilen gereksiz kodlama artıkları (örn: ÃƒÂ¯Ã‚Â¿Ã‚Â½) ve HTML etiketlerini kaldırmak.
-    text = re.sub(r'[^a-zA-Z0-9\s<>$£₺]+', ' ', text)
-    text = re.sub(r'<.*?>', ' ', text) # HTML etiketlerini kaldır
-    text = re.sub(r'(\s\s+)', ' ', text).strip()
-    
-    # 4. YENİ EKLEME: Tekrar Eden Noktalama İşaretlerini Normalleştirme ('!!!' -> '!')
-    text = re.sub(r'([!?])\1+', r'\1', text) 
-
-    # 5. Tekrarlanan Karakterleri Azaltma ('cooool' -> 'cool')
-    text = re.sub(r'(.)\1{2,}', r'\1\1', text) 
-    
+    # Unicode Normalizasyonu ve Aksan Giderme (ASCII metinde gereksiz)
+    if not text.isascii():
+        text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
+
+    # Non-ASCII / HTML temizliği, boşluk daraltma, tekrar eden karakterler ('cooool' -> 'cool')
+    if '<' in text:
+        text = strip_tags(text)
+    text = _JUNK_RE.sub(' ', text)
+    text = _MULTISPACE_RE.sub(' ', text).strip()
+    text = _REPEAT_RE.sub(r'\1\1', text)
+
     # Şüpheli Anahtar Kelimeleri Etiketleme
-    suspicious_keywords = [
-        "account", "password", "verify", "login", "update", "confirm", "reward", "won", "bank", "security", "id", "delivery", "payment", "suspend", "locked", "urgent",
-        "click", "link", "free", "immediate", "now", "alert", "warning", "change", "win", "prize", "billing", "invoice", "card", "credit", "action required", "respond",
-        "claim", "suspicious", "fraud", "limited time", "expires", "personal", "confidential", "unauthorized", "access", "reset", "secure", "transaction", "balance", "due",
-        "overdue", "pending", "failed", "declined", "package", "tracking", "shipment", "offer", "deal", "discount", "gift", "voucher", "coupon", "exclusive", 
-        "verify your identity", "update your information", "account verification", "login attempt", "security breach", "unusual activity", "contact us", "call now", 
-        "text back", "reply", "subscription", "membership", "trial", "expiration", "renew", "funds", "transfer", "deposit", "withdrawal", "review", "confirm payment", 
-        "validate", "authentication", "pin", "code", "OTP", "urgent action", "last chance", "time-sensitive", "act now", "don’t miss", "failure to respond", 
-        "account closure", "verify now", "click here", "short link", "download", "install", "app", "survey", "bonus", "cash", "lottery", "sweepstakes", "charity", 
-        "donation", "tax", "refund", "government", "IRS", "legal", "lawsuit", "warrant", "arrest", "debt", "collection", "pay now", "secure link", 
-        "personal information", "SSN", "account number", "bank details", "password reset", "urgent update", "limited offer", "exclusive offer", "contact immediately"
-    ]
-    for word in suspicious_keywords:
-        if word in text:
-            text += f" <ALERT_{word.upper()}> " 
-
-    # Anonimleştirme
-    text = re.sub(r'http\S+|www\S+', ' <URL> ', text)
-    text = re.sub(r'\S+@\S+', ' <EMAIL> ', text)
-    text = re.sub(r'(\+?\d[\d\s\-\(\)]{4,}\d)', ' <PHONE> ', text) 
-    text = re.sub(r'\b[a-z0-9.-]+\.[a-z]{2,}\b', ' <DOMAIN> ', text) 
-    text = re.sub(r'\d+\s*(usd|eur|\$|£|tl|₺)', ' <MONEY> ', text)
-    text = re.sub(r'\d+', ' <NUM> ', text)
-    
-    # Noktalama Temizliği
-    text = text.translate(str.maketrans('', '', string.punctuation.replace("'", "")))
-    
-    # Ek Temizlik
-    text = re.sub(r'\s+', ' ', text).strip()
-    
+    text += tag_suspicious_keywords(text)
+
+    # Anonimleştirme (kendi geçişi, bkz. _ENTITY_RE), noktalama temizliği ve ek temizlik
+    text = _ENTITY_RE.sub(_entity_token, text)
+    text = text.translate(_PUNCTUATION_TABLE)
+    return ' '.join(text.split())
+
+def normalize_text_indicators(text: str, entities=None):
+    """
+    normalize_text for the indicator feature layout; returns (text, indicator ids).
+
+    Entities come from scan_entities on the raw message (pass `entities` when
+    the caller already has them): their spans are cut out of the text and
+    reported as indicators, so no entity regex runs after normalization.
+    Keyword tags are left out of the text too. Indicator ids are sorted
+    INDICATOR_NAMES indices.
+    """
+    if not isinstance(text, str):
+        return "", []
+    if entities is None:
+        entities = scan_entities(text)
+
+    found = set()
+    if entities:
+        pieces, position = [], 0
+        for entity in entities:
+            found.add(_ENTITY_INDICATOR_IDS[entity.kind])
+            pieces.append(text[position:entity.start])
+            position = entity.end
+        pieces.append(text[position:])
+        text = ' '.join(pieces)
+
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
+    if '<' in text:
+        text = strip_tags(text)
+    text = _JUNK_RE.sub(' ', text)
+    text = _MULTISPACE_RE.sub(' ', text).strip()
+    text = _REPEAT_RE.sub(r'\1\1', text)
+    found.update(suspicious_keyword_ids(text))
+    text = text.translate(_PUNCTUATION_TABLE)
+    return ' '.join(text.split()), sorted(found)
+
+# --- PREPROCESSING FUNCTION ---
+def clean_tokens(text: str) -> list:
+    """
+    clean_text as a token list, before the final join.
+
+    FusedTfidfScorer takes this list directly (vectorize_tokens), so the
+    prediction path neither joins it nor re-splits it with token_pattern.
+    """
+    if not isinstance(text, str):
+        return []
     # Lemmatizasyon ve Stop Word Kaldırma
-    doc = nlp(text)
-    tokens = []
-    for token in doc:
-        lemma = token.lemma_
-        if lemma not in english_stopwords and len(lemma) > 1:
-            tokens.append(lemma)
-            
-    return ' '.join(tokens)
\ No newline at end of file
+    return lemmatize(normalize_text(text))
+
+def clean_text(text: str) -> str:
+    return ' '.join(clean_tokens(text))
+
+def clean_tokens_indicators(text: str, entities=None):
+    """clean_tokens for the indicator feature layout; returns (tokens, indicator ids)."""
+    text, indicators = normalize_text_indicators(text, entities)
+    return lemmatize(text), indicators
+
+def clean_token_lists(texts, batch_size=256, n_process=1):
+    """
+    Streaming clean_tokens for many messages; yields one token list per input.
+
+    The normalized messages go through nlp.pipe in batches
+    (and n_process worker processes), instead of one nlp() call per message.
+    Output is identical to calling clean_tokens on each message.
+    """
+    return _lemmatize_many((normalize_text(text) for text in texts), batch_size, n_process)
+
+def indicator_token_lists(texts, batch_size=256, n_process=1, entity_lists=None):
+    """
+    Streaming clean_tokens_indicators; yields one (tokens, indicator ids) pair per input.
+
+    entity_lists, if given, holds the scan_entities result for each text.
+    """
+    pending = deque()
+    if entity_lists is None:
+        entity_lists = repeat(None)
+
+    def normalized():
+        for text, entities in zip(texts, entity_lists):
+            text, indicators = normalize_text_indicators(text, entities)
+            pending.append(indicators)
+            yield text
+
+    for tokens in _lemmatize_many(normalized(), batch_size, n_process):
+        yield tokens, pending.popleft()
+
+def _lemmatize_many(normalized, batch_size, n_process):
+    model, stopwords = load_spacy()
+    for doc in model.pipe(normalized, batch_size=batch_size, n_process=n_process):
+        yield _kept_lemmas(doc, stopwords)
+
+def clean_texts(texts, batch_size=256, n_process=1):
+    """Streaming clean_text for many messages; yields one cleaned string per input."""
+    for tokens in clean_token_lists(texts, batch_size=batch_size, n_process=n_process):
+        yield ' '.join(tokens)
@@ -0,0 +1,177 @@
+# process_engine.py
+"""
+Multi-process classification backend.
+
+clean_text (regexes + lemmatization) is CPU-bound Python and holds the GIL,
+so worker threads alone do not scale across cores. ProcessClassifier runs a
+pool of worker processes instead: each one loads the vectorizer, the model
+and the language tools once, then takes batches of raw messages and sends
+back only the compact result (cleaned text, label index, decision scores
+and extracted features).
+
+Given the parent's FusedTfidfScorer, workers do not load the model files at
+all: the weights and idf are attached read-only from a shared memory-mapped
+file (see shared_model; the bundle itself when the model came from one), so
+extra workers cost no extra memory for them.
+"""
+import multiprocessing
+import os
+
+import numpy as np
+
+from components.classifier import Classification, clean_for_scorer, predict_with_scores
+from components.feature_extraction import extract_features, scan_entities
+from components.preprocess import MAX_MESSAGE_LENGTH, clean_texts, truncate_message, warm_up
+from components.shared_model import attach_fused_scorer, share_fused_scorer
+
+# Per-process (model, vectorizer, fused scorer), set by _init_worker;
+# vectorizer is None when the scorer is attached from shared arrays
+_worker_state = None
+_shared_arrays = None
+
+
+def _init_worker(model_path, vectorizer_path, shared_spec=None):
+    global _worker_state, _shared_arrays
+    if shared_spec is not None:
+        try:
+            fused_scorer, _shared_arrays = attach_fused_scorer(shared_spec)
+        except (OSError, ValueError) as e:
+            # e.g. a worker respawned after the bundle was replaced; the reload retires this pool
+            print(f"WARNING: Could not attach the shared model, loading the joblib files:\n{e}")
+            shared_spec = None
+        else:
+            _worker_state = (fused_scorer.scorer, None, fused_scorer)
+    if shared_spec is None:
+        import joblib
+        from components.fused_scorer import build_fused_scorer
+        from components.linear_model import to_linear_scorer
+
+        model = to_linear_scorer(joblib.load(model_path))
+        vectorizer = joblib.load(vectorizer_path)
+        _worker_state = (model, vectorizer, build_fused_scorer(vectorizer, model))
+    warm_up()
+
+
+def _worker_ready(_):
+    return os.getpid()
+
+
+def _classify_chunk(messages):
+    """Worker side: (cleaned texts, label indices, scores, features) for one batch."""
+    model, vectorizer, fused_scorer = _worker_state
+    entity_lists = [scan_entities(message) for message in messages]
+    if fused_scorer is not None:
+        token_lists, indicator_lists = clean_for_scorer(messages, fused_scorer, entity_lists=entity_lists)
+        cleaned = [' '.join(tokens) for tokens in token_lists]
+        scores = np.array([
+            fused_scorer.decision_function_features(fused_scorer.vectorize_tokens(tokens, indicators))
+            for tokens, indicators in zip(token_lists, indicator_lists or [None] * len(token_lists))
+        ])
+        label_idxs = fused_scorer.scorer.classes_[fused_scorer.scorer.votes(scores).argmax(axis=1)]
+    else:
+        cleaned = list(clean_texts(messages))
+        label_idxs, scores = predict_with_scores(model, vectorizer.transform(cleaned))
+    features = [extract_features(message, entities) for message, entities in zip(messages, entity_lists)]
+    return cleaned, np.asarray(label_idxs, dtype=np.int16), np.asarray(scores), features
+
+
+class ProcessClassifier:
+    """
+    Classifies batches of raw SMS on a pool of worker processes.
+
+    Same results as classify_batch. The pool uses the 'spawn' start method so
+    worker processes never inherit Tk or the parent's threads. Cache lookups
+    (if a PredictionCache is given) stay in the parent; only misses are sent
+    to the workers, split into chunks of `chunk_size` messages.
+
+    With `shared_scorer` (the parent's FusedTfidfScorer) workers attach to its
+    arrays instead of loading model_path/vectorizer_path themselves. Messages
+    are truncated to max_length (truncate_message) before they are sent.
+    """
+
+    def __init__(self, model_path, vectorizer_path, labels, processes=None, chunk_size=64, cache=None,
+                 shared_scorer=None, max_length=MAX_MESSAGE_LENGTH):
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.labels = list(labels)
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.shared_scorer = shared_scorer
+        self.max_length = max_length
+        self.shared_arrays = None
+        self._pool = None
+
+    # ---------- Lifecycle ----------
+    def start(self, wait=True):
+        """Spawn the workers; with wait=True, return only once every worker has loaded the model."""
+        if self._pool is None:
+            shared_spec = None
+            if self.shared_scorer is not None:
+                self.shared_arrays, shared_spec = share_fused_scorer(self.shared_scorer)
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(
+                self.processes,
+                initializer=_init_worker,
+                initargs=(self.model_path, self.vectorizer_path, shared_spec),
+            )
+        if wait:
+            self._pool.map(_worker_ready, range(self.processes), chunksize=1)
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self.shared_arrays is not None:
+            self.shared_arrays.close()
+            self.shared_arrays = None
+
+    @property
+    def worker_pids(self):
+        return [process.pid for process in self._pool._pool] if self._pool is not None else []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- Classification ----------
+    def classify(self, messages):
+        """One Classification per raw message, in order."""
+        if self._pool is None:
+            raise RuntimeError("ProcessClassifier has not been started")
+
+        messages = [message if isinstance(message, str) else "" for message in messages]
+        texts = [truncate_message(message, self.max_length) for message in messages]
+        results = [None] * len(messages)
+        misses = []
+        for i, text in enumerate(texts):
+            cached = self.cache.get(text) if self.cache is not None else None
+            if cached is None:
+                misses.append(i)
+            else:
+                results[i] = (cached.text_clean, cached.label_idx, cached.scores, extract_features(text))
+
+        chunks = [misses[i:i + self.chunk_size] for i in range(0, len(misses), self.chunk_size)]
+        outputs = self._pool.map(_classify_chunk, [[texts[i] for i in chunk] for chunk in chunks], chunksize=1)
+        for chunk, (cleaned, label_idxs, scores, features) in zip(chunks, outputs):
+            for row, i in enumerate(chunk):
+                label_idx = int(label_idxs[row])
+                if self.cache is not None:
+                    self.cache.put(texts[i], cleaned[row], label_idx, scores[row])
+                results[i] = (cleaned[row], label_idx, scores[row], features[row])
+
+        return [
+            Classification(
+                message=message,
+                label=self.labels[label_idx],
+                label_idx=label_idx,
+                scores=scores,
+                features=features,
+                text_clean=text_clean,
+            )
+            for message, (text_clean, label_idx, scores, features) in zip(messages, results)
+        ]
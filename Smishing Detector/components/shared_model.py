@@ -0,0 +1,166 @@
+# shared_model.py
+"""
+Model arrays shared read-only between worker processes via one memory-mapped file.
+
+Without this, every ProcessClassifier worker joblib.loads its own copy of the
+model and vectorizer. Instead each worker np.memmaps the scorer weights,
+intercepts, classes, idf and the compact vocabulary read-only from one
+file: all processes then read the same physical pages from the OS page
+cache, and an extra worker adds no private memory for them.
+
+A model loaded from sms_model.bundle is already mapped from such a file, so
+workers are pointed at the bundle itself and its array offsets. Only a model
+that came from the joblib files has its arrays written once to a temp file.
+The file's identity (inode, size, mtime) goes with the handle, and a worker
+refuses to attach if the bundle was replaced in the meantime.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from components.fused_scorer import FusedTfidfScorer
+from components.linear_model import LinearSVCScorer
+from components.vocabulary import CompactVocabulary
+
+ALIGNMENT = 64
+
+
+class SharedArrays:
+    """Named, read-only numpy arrays packed into one memory-mapped file."""
+
+    def __init__(self, path, layout, owner=False, identity=None):
+        self.path = path
+        self.layout = layout
+        self.owner = owner
+        self.identity = identity if identity is not None else _file_identity(path)
+        self._map = np.memmap(path, dtype=np.uint8, mode="r") if layout else None
+
+    @classmethod
+    def create(cls, arrays, directory=None):
+        """Write `arrays` ({name: ndarray}) to a new temp file; the creator deletes it on close()."""
+        fd, path = tempfile.mkstemp(prefix="smishing-model-", suffix=".weights", dir=directory)
+        layout = {}
+        offset = 0
+        with os.fdopen(fd, "wb") as f:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                padding = -offset % ALIGNMENT
+                f.write(b"\0" * padding)
+                offset += padding
+                layout[name] = (offset, array.dtype.str, array.shape)
+                f.write(array.tobytes())
+                offset += array.nbytes
+        return cls(path, layout, owner=True)
+
+    @classmethod
+    def in_place(cls, arrays):
+        """SharedArrays over the file `arrays` are already mapped from, or None if they are not all in one."""
+        path, layout = None, {}
+        for name, array in arrays.items():
+            location = _file_location(array)
+            if location is None or path not in (None, location[0]):
+                return None
+            path = location[0]
+            layout[name] = (location[1], array.dtype.str, array.shape)
+        return cls(path, layout) if path is not None else None
+
+    @classmethod
+    def attach(cls, handle):
+        path, layout, identity = handle
+        if _file_identity(path) != identity:
+            raise ValueError(f"{path} was replaced after the model was shared")
+        return cls(path, layout, identity=identity)
+
+    @property
+    def handle(self):
+        """Picklable reference passed to worker processes."""
+        return self.path, self.layout, self.identity
+
+    @property
+    def nbytes(self):
+        return os.path.getsize(self.path)
+
+    def __getitem__(self, name):
+        offset, dtype, shape = self.layout[name]
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        return self._map[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+
+    def close(self):
+        self._map = None
+        if self.owner:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _file_location(array):
+    """(file path, byte offset) of a contiguous array that is a view into a read-only np.memmap, else None."""
+    mapped = array
+    while isinstance(mapped, np.ndarray) and not isinstance(mapped, np.memmap):
+        mapped = mapped.base  # np.asarray(memmap) and friends return plain views of it
+    if not isinstance(mapped, np.memmap) or mapped.filename is None or mapped.mode != "r":
+        return None
+    if not array.flags.c_contiguous:
+        return None
+    root = mapped
+    while isinstance(root.base, np.memmap):
+        root = root.base
+    return root.filename, root.offset + (array.ctypes.data - root.ctypes.data)
+
+
+def share_fused_scorer(fused_scorer, directory=None):
+    """
+    Make a FusedTfidfScorer's arrays available to other processes as SharedArrays.
+
+    Arrays mapped from a bundle are shared where they are; otherwise they are
+    written to a temp file (closed and deleted with the returned SharedArrays).
+    Returns (shared arrays, spec); the spec is picklable and rebuilds the
+    scorer in another process with attach_fused_scorer().
+    """
+    scorer = fused_scorer.scorer
+    vocabulary = fused_scorer.vocabulary
+    if not isinstance(vocabulary, CompactVocabulary):
+        vocabulary = CompactVocabulary.from_dict(vocabulary)
+    terms, term_offsets, vocab_slots = vocabulary.arrays
+    arrays = {
+        "weights": scorer.weights,
+        "intercepts": scorer.intercepts,
+        "classes": scorer.classes_,
+        "idf": fused_scorer.idf,
+        "terms": terms,
+        "term_offsets": term_offsets,
+        "vocab_slots": vocab_slots,
+    }
+    shared = SharedArrays.in_place(arrays) or SharedArrays.create(arrays, directory=directory)
+    spec = {
+        "arrays": shared.handle,
+        "token_pattern": fused_scorer.token_re.pattern,
+        "ngram_range": (fused_scorer.min_n, fused_scorer.max_n),
+        "lowercase": fused_scorer.lowercase,
+        "n_indicators": fused_scorer.n_indicators,
+    }
+    return shared, spec
+
+
+def attach_fused_scorer(spec):
+    """(FusedTfidfScorer, SharedArrays) whose arrays are views on the shared file, not copies."""
+    shared = SharedArrays.attach(spec["arrays"])
+    scorer = LinearSVCScorer(shared["weights"], shared["intercepts"], shared["classes"])
+    fused_scorer = FusedTfidfScorer(
+        CompactVocabulary(shared["terms"], shared["term_offsets"], shared["vocab_slots"]),
+        shared["idf"],
+        scorer,
+        token_pattern=spec["token_pattern"],
+        ngram_range=spec["ngram_range"],
+        lowercase=spec["lowercase"],
+        n_indicators=spec["n_indicators"],
+    )
+    return fused_scorer, shared
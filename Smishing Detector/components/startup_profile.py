@@ -0,0 +1,70 @@
+# startup_profile.py
+"""
+Summarized `python -X importtime` report for the app's startup imports.
+
+import_time_report() imports a module in a fresh interpreter and returns
+per-package totals plus the set of modules that got imported, e.g.
+
+    report = import_time_report("app")
+    assert not report.imported(DEFERRED_MODULES)
+"""
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies that must only load on first use (OCR, QR, NLP, model unpickling).
+DEFERRED_MODULES = ("cv2", "pytesseract", "qrcode", "spacy", "nltk", "sklearn", "joblib")
+
+
+class ImportReport(namedtuple("ImportReport", ["total_us", "packages", "modules"])):
+    """total_us: summed self time; packages: {top-level package: self time in us}; modules: set of names."""
+
+    def imported(self, names):
+        """The subset of `names` (top-level packages) that were imported."""
+        return sorted(name for name in names if name in self.packages)
+
+    def top(self, count=10):
+        return sorted(self.packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def format(self, count=10):
+        lines = [f"startup imports: {len(self.modules)} modules, {self.total_us / 1000:.1f} ms"]
+        for package, self_us in self.top(count):
+            lines.append(f"  {package:<24} {self_us / 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+def parse_importtime(output):
+    """Parse `-X importtime` lines ('import time: self | cumulative | name') into an ImportReport."""
+    packages = {}
+    modules = set()
+    total = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        self_us = int(fields[0])
+        name = fields[2].strip()
+        top_level = name.split(".")[0]
+        modules.add(name)
+        packages[top_level] = packages.get(top_level, 0) + self_us
+        total += self_us
+    return ImportReport(total, packages, modules)
+
+
+def import_time_report(module="app", cwd=APP_DIR, timeout=120):
+    """Import `module` in a fresh interpreter with -X importtime and summarize it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{module}' failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
@@ -0,0 +1,130 @@
+# vocabulary.py
+"""
+Compact, memory-mappable TF-IDF vocabulary.
+
+TfidfVectorizer.vocabulary_ is a Python dict of ~5000 str -> numpy.int64
+entries that has to be unpickled (and held privately) by every process. Here
+the terms are one UTF-8 blob in feature-id order plus an offsets array, and
+lookups go through an open-addressing hash table of feature ids (crc32,
+linear probing, load factor <= 0.5). All three arrays live in the model
+bundle and are used straight from the mapping: nothing is built at load
+time, and worker processes share the same pages.
+
+Probing the table from Python costs a crc32 call, a slice and a compare per
+term (about 800 ns, against 60 ns for a dict hit), which is too slow for the
+fused scorer's per-document loop. lookup_many therefore goes through a plain
+term -> id dict built from the arrays the first time it runs, once per
+process; get() and the other single-term lookups still probe the table and
+build nothing.
+"""
+import zlib
+
+import numpy as np
+
+EMPTY_SLOT = -1
+
+
+def _table_size(n_terms):
+    size = 1
+    while size < 2 * n_terms:
+        size *= 2
+    return size
+
+
+def encode_terms(vocabulary):
+    """(UTF-8 blob as uint8, int64 offsets) for a term -> feature id mapping."""
+    terms = [None] * len(vocabulary)
+    for term, idx in vocabulary.items():
+        terms[idx] = term.encode("utf-8")
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(term) for term in terms], out=offsets[1:])
+    return np.frombuffer(b"".join(terms), dtype=np.uint8), offsets
+
+
+def build_slots(terms, offsets):
+    """Hash table (int32 feature ids, EMPTY_SLOT for free) for an encoded term blob."""
+    blob = bytes(terms)
+    offsets = offsets.tolist()
+    size = _table_size(len(offsets) - 1)
+    mask = size - 1
+    slots = np.full(size, EMPTY_SLOT, dtype=np.int32)
+    for idx, (start, end) in enumerate(zip(offsets, offsets[1:])):
+        h = zlib.crc32(blob[start:end]) & mask
+        while slots[h] != EMPTY_SLOT:
+            h = (h + 1) & mask
+        slots[h] = idx
+    return slots
+
+
+class CompactVocabulary:
+    """Read-only term -> feature id mapping over (terms blob, offsets, hash slots) arrays."""
+
+    def __init__(self, terms, offsets, slots):
+        if len(slots) & (len(slots) - 1):
+            raise ValueError("hash table size must be a power of two")
+        self._arrays = (terms, offsets, slots)
+        # memoryviews index to plain ints without numpy scalar overhead
+        self._blob = memoryview(np.ascontiguousarray(terms))
+        self._offsets = memoryview(np.ascontiguousarray(offsets))
+        self._slots = memoryview(np.ascontiguousarray(slots))
+        self._mask = len(slots) - 1
+        self._index = None
+
+    def __reduce__(self):
+        return CompactVocabulary, self._arrays
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        terms, offsets = encode_terms(vocabulary)
+        return cls(terms, offsets, build_slots(terms, offsets))
+
+    @property
+    def arrays(self):
+        """(terms, offsets, slots), e.g. for writing into a bundle."""
+        return self._arrays
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays)
+
+    def term(self, idx):
+        return bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]]).decode("utf-8")
+
+    def get(self, term, default=None):
+        key = term.encode("utf-8")
+        blob, offsets, slots, mask = self._blob, self._offsets, self._slots, self._mask
+        h = zlib.crc32(key) & mask
+        while True:
+            idx = slots[h]
+            if idx == EMPTY_SLOT:
+                return default
+            if blob[offsets[idx]:offsets[idx + 1]] == key:
+                return idx
+            h = (h + 1) & mask
+
+    def lookup_many(self, terms):
+        """Feature id (or None) for each term; the per-document hot loop of the fused scorer."""
+        index = self._index
+        if index is None:
+            index = self._index = self._build_index()
+        return [index.get(term) for term in terms]
+
+    def _build_index(self):
+        blob = bytes(self._blob)
+        offsets = np.asarray(self._arrays[1]).tolist()
+        return {blob[start:end].decode("utf-8"): idx for idx, (start, end) in enumerate(zip(offsets, offsets[1:]))}
+
+    def __getitem__(self, term):
+        idx = self.get(term)
+        if idx is None:
+            raise KeyError(term)
+        return idx
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def items(self):
+        return ((self.term(idx), idx) for idx in range(len(self)))
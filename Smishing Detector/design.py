@@ -295,6 +295,8 @@ def build_ui():
         details_text.insert("end", " CLASSIFICATION ", "header")
         details_text.insert("end", "\n\n")
         details_text.insert("end", f"{icon} {label_text.capitalize()}\n\n", "classification")
+        if entry.get("model_version"):
+            details_text.insert("end", f"Model version: {entry['model_version']}\n\n", "info")
 
         details_text.insert("end", " MESSAGE ", "header")
         details_text.insert("end", "\n\n")
@@ -413,6 +415,8 @@ def build_ui():
         details_text.insert("end", " CLASSIFICATION ", "header")
         details_text.insert("end", "\n\n")
         details_text.insert("end", f"{icon} {label_text.capitalize()}\n\n", "classification")
+        if entry.get("model_version"):
+            details_text.insert("end", f"Model version: {entry['model_version']}\n\n", "info")
 
         details_text.insert("end", " MESSAGE ", "header")
         details_text.insert("end", "\n\n")
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.model_bundle import export_from_joblib, load_bundle
+
+# --- joblib model + vektörleştirici -> tek dosyalık, mmap'lenebilir paket ---
+MODEL_PATH = 'model/sms_model.joblib'
+VECTORIZER_PATH = 'model/tfidf_vectorizer.joblib'
+BUNDLE_PATH = 'model/sms_model.bundle'
+# LabelEncoder sırası (model.py): sınıf 0, 1, 2
+LABELS = ['ham', 'smishing', 'spam']
+
+model_version = sys.argv[1] if len(sys.argv) > 1 else None
+version = export_from_joblib(MODEL_PATH, VECTORIZER_PATH, BUNDLE_PATH, LABELS, model_version=model_version)
+
+bundle = load_bundle(BUNDLE_PATH)
+print(f"Model paketi kaydedildi: {BUNDLE_PATH} ({os.path.getsize(BUNDLE_PATH) / 1024:.1f} KB)")
+print(f"Sürüm: {version}, sınıflar: {bundle.labels}, özellik sayısı: {bundle.n_features}")